@@ -1,5 +1,7 @@
 from pathlib import Path
 from typing import List
+from collections import deque
+from dataclasses import dataclass, asdict, field
 import typer
 import google.generativeai as genai
 from phi.assistant import Assistant
@@ -14,13 +16,26 @@ from tkinter import ttk
 import subprocess
 import json
 import re
+import sys
+import asyncio
 import uuid
+import random
+import hashlib
+import xml.etree.ElementTree as ET
+import queue
+import shutil
+import signal
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, wait, as_completed, FIRST_COMPLETED, CancelledError
 import requests
+import httpx
 from phi.agent import Agent, RunResponse
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_mistralai import ChatMistralAI
 from langchain.agents import AgentExecutor, create_openai_tools_agent
-from langchain_core.messages import SystemMessage, HumanMessage
+from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, AIMessageChunk
+from colorama import Fore, Style, init as colorama_init
 
 
 
@@ -86,6 +101,16 @@ namespace YourProject.Tests
     }
 }'''
 
+# Üretilen Tests.csproj'un sabitlenmiş paket sürümleri (yerel paket feed'i de bunlarla hazırlanır)
+PINNED_TEST_PACKAGES = [
+    ("Microsoft.NET.Test.Sdk", "17.9.0"),
+    ("xunit", "2.6.6"),
+    ("xunit.runner.visualstudio", "2.5.6"),
+    ("coverlet.collector", "6.0.0"),
+    ("Moq", "4.20.70"),
+    ("FluentAssertions", "6.12.0")
+]
+
 class TestGeneratorGUI:
     def __init__(self):
         self.root = tk.Tk()
@@ -126,9 +151,28 @@ class TestGeneratorGUI:
         self.solution_combo.grid(row=4, column=0, sticky=(tk.W, tk.E), pady=5)
         self.solution_combo.grid_remove()  # Başlangıçta gizli
         
-        # Test oluşturma butonu
-        self.generate_button = ttk.Button(main_frame, text="Testleri Oluştur ve Çalıştır", command=self.generate_and_run_tests)
-        self.generate_button.grid(row=5, column=0, pady=20)
+        # Paralel işçi sayısı ve test oluşturma butonu
+        action_frame = ttk.Frame(main_frame)
+        action_frame.grid(row=5, column=0, pady=20)
+        
+        ttk.Label(action_frame, text="Paralel İşçi:").grid(row=0, column=0, padx=5)
+        self.workers_var = tk.IntVar(value=1)
+        self.workers_spin = ttk.Spinbox(action_frame, from_=1, to=16, textvariable=self.workers_var, width=5)
+        self.workers_spin.grid(row=0, column=1, padx=5)
+        
+        self.refresh_cache_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(action_frame, text="LLM önbelleğini yenile", variable=self.refresh_cache_var).grid(row=0, column=2, padx=5)
+        
+        self.coverage_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(action_frame, text="Kod kapsamını ölç", variable=self.coverage_var).grid(row=0, column=3, padx=5)
+        
+        # Bu kadar build hatası görülünce build erken durdurulur (0: sınırsız)
+        ttk.Label(action_frame, text="Build Hata Sınırı:").grid(row=0, column=4, padx=5)
+        self.build_error_limit_var = tk.IntVar(value=0)
+        ttk.Spinbox(action_frame, from_=0, to=1000, textvariable=self.build_error_limit_var, width=5).grid(row=0, column=5, padx=5)
+        
+        self.generate_button = ttk.Button(action_frame, text="Testleri Oluştur ve Çalıştır", command=self.generate_and_run_tests)
+        self.generate_button.grid(row=0, column=6, padx=5)
         
         # Log alanı
         log_frame = ttk.LabelFrame(main_frame, text="Test Sonuçları ve Analiz", padding="5")
@@ -139,11 +183,28 @@ class TestGeneratorGUI:
         self.log_text = scrolledtext.ScrolledText(log_frame, height=15, width=80)
         self.log_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
+        self.log_text.tag_configure("success", foreground="green")
+        self.log_text.tag_configure("error", foreground="red")
+        self.log_text.tag_configure("warning", foreground="orange")
+        
         # Progress bar
         self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
         self.progress.grid(row=7, column=0, sticky=(tk.W, tk.E), pady=10)
         
+        # Log kayıtları işçi thread'inden kuyruğa yazılır, GUI zamanlayıcıyla toplu olarak boşaltır
+        self.log_queue = queue.Queue()
+        self.max_log_lines = 5000       # Log alanında tutulacak en fazla satır (ring buffer)
+        self.log_batch_size = 500       # Bir zamanlayıcı turunda yazılacak en fazla kayıt
+        self.log_poll_interval = 100    # ms
+        self.worker_thread = None
+        self.root.after(self.log_poll_interval, self.drain_log_queue)
+        
     def log_message(self, message: str, level: str = "info"):
+        """Log kaydını kuyruğa ekler; herhangi bir thread'den çağrılabilir."""
+        self.log_queue.put((f"{message}\n", level))
+        
+    def drain_log_queue(self):
+        """Kuyruktaki log kayıtlarını toplu olarak yazar ve eski satırları budar."""
         tags = {
             "info": "",
             "success": "success",
@@ -151,13 +212,40 @@ class TestGeneratorGUI:
             "warning": "warning"
         }
         
-        self.log_text.tag_configure("success", foreground="green")
-        self.log_text.tag_configure("error", foreground="red")
-        self.log_text.tag_configure("warning", foreground="orange")
+        # Aynı seviyedeki ardışık kayıtları tek insert çağrısında birleştir
+        chunks = []
+        finished = False
+        for _ in range(self.log_batch_size):
+            try:
+                message, level = self.log_queue.get_nowait()
+            except queue.Empty:
+                break
+            if message is None:
+                finished = True
+                continue
+            tag = tags.get(level, "")
+            if chunks and chunks[-1][1] == tag:
+                chunks[-1][0].append(message)
+            else:
+                chunks.append(([message], tag))
+        
+        if chunks:
+            for messages, tag in chunks:
+                self.log_text.insert(tk.END, "".join(messages), tag)
+            
+            # Ring buffer: en eski satırları sil
+            line_count = int(self.log_text.index('end-1c').split('.')[0])
+            if line_count > self.max_log_lines:
+                self.log_text.delete(1.0, f"{line_count - self.max_log_lines + 1}.0")
+            self.log_text.see(tk.END)
         
-        self.log_text.insert(tk.END, f"{message}\n", tags[level])
-        self.log_text.see(tk.END)
-        self.root.update()
+        if finished:
+            self.progress.stop()
+            self.generate_button.state(['!disabled'])
+        
+        # Kuyrukta kayıt kaldıysa hemen, yoksa bir sonraki turda devam et
+        delay = 1 if not self.log_queue.empty() else self.log_poll_interval
+        self.root.after(delay, self.drain_log_queue)
         
     def browse_directory(self):
         directory = filedialog.askdirectory()
@@ -178,12 +266,34 @@ class TestGeneratorGUI:
             messagebox.showerror("Hata", "Lütfen proje yolunu seçiniz!")
             return
         
+        if self.worker_thread and self.worker_thread.is_alive():
+            return
+        
         self.log_text.delete(1.0, tk.END)
         self.progress.start()
         self.generate_button.state(['disabled'])
         
+        # Tk değişkenleri yalnızca ana thread'de okunur
+        options = {
+            "max_workers": self.workers_var.get(),
+            "cache_mode": "refresh" if self.refresh_cache_var.get() else "use",
+            "collect_coverage": self.coverage_var.get(),
+            "build_error_limit": self.build_error_limit_var.get() or None
+        }
+        
+        # Pipeline arka planda çalışır, GUI olay döngüsü bloklanmaz
+        self.worker_thread = threading.Thread(
+            target=self.run_generator,
+            args=(api_key, project_path, options),
+            daemon=True
+        )
+        self.worker_thread.start()
+        
+    def run_generator(self, api_key: str, project_path: str, options: dict):
+        """Test üretimini işçi thread'inde çalıştırır."""
+        generator = None
         try:
-            generator = CSharpTestGenerator(api_key)
+            generator = CSharpTestGenerator(api_key, **options)
             test_results = generator.generate_and_run_tests(project_path, self.log_message)
             
             if test_results:
@@ -192,14 +302,14 @@ class TestGeneratorGUI:
         except Exception as e:
             self.log_message(f"Hata oluştu: {str(e)}", "error")
         finally:
-            self.progress.stop()
-            self.generate_button.state(['!disabled'])
+            if generator:
+                generator.close()
+            # Bitiş işareti: GUI thread'i progress bar'ı durdurup butonu açar
+            self.log_queue.put((None, "done"))
             
     def analyze_test_results(self, test_results: dict, generator: 'CSharpTestGenerator'):
-        for test_file, result in test_results.items():
-            if result.get("error"):
-                self.log_message(f"\nTest dosyası analizi: {test_file}", "warning")
-                generator.analyze_test_error(test_file, result["error"], self.log_message)
+        # Hata analizleri aynı anda istenir
+        generator.analyze_test_errors(test_results, self.log_message)
 
     def update_solution_list(self, solutions):
         """Solution listesini günceller ve ComboBox'ı gösterir."""
@@ -213,36 +323,2039 @@ class TestGeneratorGUI:
 class OllamaAPI:
     def __init__(self, base_url="http://localhost:11434"):
         self.base_url = base_url
+        # Keep-alive bağlantılarını istekler arasında yeniden kullan
+        self.session = requests.Session()
         
-    def generate(self, prompt: str, model: str = "qwen2.5-coder:latest") -> str:
-        """Ollama API'sini kullanarak yanıt üretir."""
+    def generate(self, prompt: str, model: str = "qwen2.5-coder:latest", on_text=None, should_stop=None) -> str:
+        """Ollama API'sini kullanarak yanıtı akış halinde üretir.
+
+        on_text ve should_stop her yeni metin parçasıyla çağrılır; should_stop True dönerse
+        üretim erken kesilir.
+        """
         url = f"{self.base_url}/api/generate"
         
         data = {
             "model": model,
             "prompt": prompt,
-            "stream": False
+            "stream": True
         }
         
+        text = ""
         try:
-            response = requests.post(url, json=data)
-            response.raise_for_status()
-            result = response.json()
-            return result.get('response', '')
+            with self.session.post(url, json=data, stream=True) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    result = json.loads(line)
+                    delta = result.get('response', '')
+                    if delta:
+                        text += delta
+                        if on_text:
+                            on_text(delta)
+                    if result.get('done') or (should_stop and should_stop(delta)):
+                        break
+            return text
         except Exception as e:
             print(f"Ollama API hatası: {str(e)}")
+            return text
+
+@dataclass
+class TestCaseResult:
+    """TRX dosyasındaki tek bir testin sonucu."""
+    name: str
+    outcome: str
+    duration: float
+    message: str = ""
+    stack_trace: str = ""
+
+def _xml_local_name(tag: str) -> str:
+    """XML etiketinden namespace önekini atar."""
+    return tag.rsplit('}', 1)[-1]
+
+def parse_trx_duration(value: str) -> float:
+    """TRX süre değerini (hh:mm:ss.fffffff) saniyeye çevirir."""
+    if not value:
+        return 0.0
+    try:
+        hours, minutes, seconds = value.split(':')
+        return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    except ValueError:
+        return 0.0
+
+def iter_trx_results(trx_path: Path):
+    """TRX dosyasını iterparse ile akış halinde okuyup her test için TestCaseResult üretir."""
+    parents = []
+    for event, elem in ET.iterparse(str(trx_path), events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+
+        parents.pop()
+        name = _xml_local_name(elem.tag)
+        if name == "UnitTestResult":
+            message = ""
+            stack_trace = ""
+            for child in elem.iter():
+                child_name = _xml_local_name(child.tag)
+                if child_name == "Message" and not message:
+                    message = (child.text or "").strip()
+                elif child_name == "StackTrace" and not stack_trace:
+                    stack_trace = (child.text or "").strip()
+            yield TestCaseResult(
+                name=elem.get("testName", ""),
+                outcome=elem.get("outcome", ""),
+                duration=parse_trx_duration(elem.get("duration")),
+                message=message,
+                stack_trace=stack_trace
+            )
+
+        # İşlenen kayıtları ağaçtan çıkararak bellek kullanımını sabit tut
+        if name in ("UnitTestResult", "UnitTest", "TestEntry") and parents:
+            parents[-1].remove(elem)
+
+def summarize_test_cases(test_cases: List[TestCaseResult]) -> dict:
+    """Test sonuçlarını başarılı/başarısız/atlanmış olarak sayar."""
+    summary = {"passed": 0, "failed": 0, "skipped": 0, "total": 0}
+    for case in test_cases:
+        summary["total"] += 1
+        if case.outcome == "Passed":
+            summary["passed"] += 1
+        elif case.outcome in ("Failed", "Error", "Timeout", "Aborted"):
+            summary["failed"] += 1
+        else:
+            summary["skipped"] += 1
+    return summary
+
+class AsyncOllamaAPI:
+    """Ollama /api/chat uç noktası için keep-alive bağlantı havuzlu async istemci."""
+
+    def __init__(self, base_url="http://localhost:11434", model: str = "qwen2.5-coder:latest", temperature: float = 0.7, top_p: float = 0.95, max_tokens: int = 4096, max_connections: int = 8, timeout: float = 600.0):
+        self.base_url = base_url
+        self.model = model
+        self.options = {"temperature": temperature, "top_p": top_p, "num_predict": max_tokens}
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # İstemci, kullanılacağı event loop içinde ilk çağrıda oluşturulur
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                timeout=self.timeout
+            )
+        return self._client
+
+    def _payload(self, messages: list, stream: bool, **kwargs) -> dict:
+        roles = {"SystemMessage": "system", "HumanMessage": "user", "AIMessage": "assistant"}
+        return {
+            "model": self.model,
+            "messages": [{"role": roles.get(type(m).__name__, "user"), "content": str(m.content)} for m in messages],
+            "stream": stream,
+            "options": {**self.options, **kwargs}
+        }
+
+    async def astream(self, messages: list, **kwargs):
+        """Yanıtı Ollama'dan satır satır (NDJSON) okuyup AIMessageChunk olarak üretir.
+
+        Çağıran döngüden çıkıp üreteci kapatırsa bağlantı kapatılır ve model üretimi durdurur.
+        """
+        async with self._get_client().stream("POST", "/api/chat", json=self._payload(messages, True, **kwargs)) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                result = json.loads(line)
+                metadata = {}
+                if result.get("done"):
+                    metadata["token_usage"] = {
+                        "prompt_tokens": result.get("prompt_eval_count", 0),
+                        "completion_tokens": result.get("eval_count", 0)
+                    }
+                yield AIMessageChunk(content=result.get("message", {}).get("content", ""), response_metadata=metadata)
+
+    async def ainvoke(self, messages: list, **kwargs) -> AIMessage:
+        """Mesaj listesini Ollama'ya gönderir ve yanıtı AIMessage olarak döndürür."""
+        payload = self._payload(messages, False, **kwargs)
+        response = await self._get_client().post("/api/chat", json=payload)
+        response.raise_for_status()
+        result = response.json()
+        return AIMessage(
+            content=result.get("message", {}).get("content", ""),
+            response_metadata={"token_usage": {
+                "prompt_tokens": result.get("prompt_eval_count", 0),
+                "completion_tokens": result.get("eval_count", 0)
+            }}
+        )
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+def estimate_tokens(text: str) -> int:
+    """Metnin token sayısını kabaca tahmin eder (yaklaşık 4 karakter = 1 token)."""
+    return len(text) // 4 + 1
+
+def classify_llm_error(exc: Exception) -> tuple:
+    """LLM hatasının tekrar denenebilir olup olmadığını, Retry-After süresini ve HTTP kodunu döndürür."""
+    status = None
+    retry_after = None
+    response = getattr(exc, "response", None)
+    if response is not None:
+        status = getattr(response, "status_code", None)
+        headers = getattr(response, "headers", None) or {}
+        try:
+            retry_after = float(headers.get("retry-after")) if headers.get("retry-after") else None
+        except (TypeError, ValueError):
+            retry_after = None
+
+    # langchain bazı sağlayıcı hatalarını yalnızca mesaj olarak iletir
+    message = str(exc)
+    if status is None:
+        status_match = re.search(r'\b(429|5\d\d)\b', message)
+        if status_match:
+            status = int(status_match.group(1))
+    if status is None and "rate limit" in message.lower():
+        status = 429
+
+    if status == 429 or (status is not None and 500 <= status < 600):
+        return True, retry_after, status
+    if isinstance(exc, (httpx.TimeoutException, httpx.TransportError, asyncio.TimeoutError)):
+        return True, None, None
+    return False, None, status
+
+class AdaptiveRateLimiter:
+    """İstek/dakika ve token/dakika bütçeli token bucket; 429 yanıtlarında hızını düşürür, başarıda geri artırır.
+
+    Hiç bütçe verilmediyse istekler beklemeden geçer; ilk 429'da son bir dakikada gözlenen istek
+    sayısı istek/dakika bütçesi olarak kullanılmaya başlanır (inferred_limit).
+    """
+
+    def __init__(self, requests_per_minute: int = None, tokens_per_minute: int = None, min_factor: float = 0.1, recovery_step: float = 0.05):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.min_factor = min_factor
+        self.recovery_step = recovery_step
+        self.factor = 1.0
+        self.inferred_limit = False
+        self._request_budget = float(requests_per_minute or 0)
+        self._token_budget = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = None
+        # Bütçe yokken son bir dakikadaki istek zamanları (429'da bütçe buradan türetilir)
+        self._recent_requests = deque()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            rate = self.requests_per_minute * self.factor / 60
+            self._request_budget = min(self.requests_per_minute, self._request_budget + elapsed * rate)
+        if self.tokens_per_minute:
+            rate = self.tokens_per_minute * self.factor / 60
+            self._token_budget = min(self.tokens_per_minute, self._token_budget + elapsed * rate)
+
+    async def acquire(self, tokens: int = 0):
+        """Bütçe yetene kadar bekler ve bir istek ile tahmini token'ları düşer."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+
+                wait = 0.0
+                if self.requests_per_minute and self._request_budget < 1:
+                    wait = max(wait, (1 - self._request_budget) / (self.requests_per_minute * self.factor / 60))
+                needed_tokens = min(tokens, self.tokens_per_minute) if self.tokens_per_minute else 0
+                if self.tokens_per_minute and self._token_budget < needed_tokens:
+                    wait = max(wait, (needed_tokens - self._token_budget) / (self.tokens_per_minute * self.factor / 60))
+
+                if wait <= 0:
+                    if not self.requests_per_minute and not self.tokens_per_minute:
+                        self._recent_requests.append(now)
+                        while self._recent_requests and now - self._recent_requests[0] > 60:
+                            self._recent_requests.popleft()
+                    if self.requests_per_minute:
+                        self._request_budget -= 1
+                    if self.tokens_per_minute:
+                        self._token_budget -= needed_tokens
+                    return
+                await asyncio.sleep(wait)
+
+    def on_rate_limited(self, retry_after: float = None) -> bool:
+        """429 alındığında hızı yarıya indirir ve gerekiyorsa tüm istekleri Retry-After kadar durdurur.
+
+        Bütçe yoksa gözlenen istek hızından bir istek/dakika bütçesi türetir ve True döndürür.
+        """
+        inferred = False
+        if not self.requests_per_minute and not self.tokens_per_minute:
+            now = time.monotonic()
+            self.requests_per_minute = max(1, sum(1 for started in self._recent_requests if now - started <= 60))
+            self._recent_requests.clear()
+            self._request_budget = 0.0
+            self._updated = now
+            self.inferred_limit = inferred = True
+        self.factor = max(self.min_factor, self.factor * 0.5)
+        if retry_after:
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        return inferred
+
+    def on_success(self, token_correction: int = 0):
+        """Başarılı istekte hızı kademeli olarak artırır ve tahmini token farkını bütçeye yansıtır."""
+        self.factor = min(1.0, self.factor + self.recovery_step)
+        if self.tokens_per_minute and token_correction:
+            self._token_budget -= token_correction
+
+def response_token_usage(response) -> tuple:
+    """LLM yanıtından (prompt, completion) token sayılarını okur; sağlayıcı bildirmediyse 0 döner."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    token_usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+    prompt_tokens = usage.get("input_tokens") or token_usage.get("prompt_tokens") or 0
+    completion_tokens = usage.get("output_tokens") or token_usage.get("completion_tokens") or 0
+    return prompt_tokens, completion_tokens
+
+@dataclass
+class LLMCallMetrics:
+    """Tek bir LLM çağrısının maliyet ve süre ölçümleri."""
+    kind: str
+    model: str
+    attempt: int = None
+    file: str = None
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency: float = 0.0
+    time_to_first_token: float = 0.0
+    cached: bool = False
+    prefetched: bool = False
+    # Sağlayıcı token sayısı bildirmediyse değerler estimate_tokens ile tahmin edilir
+    estimated: bool = False
+
+def summarize_llm_calls(calls: List[LLMCallMetrics]) -> dict:
+    """LLM çağrılarını türe göre toplar (çağrı, token ve süre toplamları)."""
+    summary = {}
+    for call in calls:
+        entry = summary.setdefault(call.kind, {
+            "calls": 0,
+            "cached": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "latency": 0.0,
+            "avg_latency": 0.0,
+            "avg_time_to_first_token": 0.0
+        })
+        if call.cached:
+            entry["cached"] += 1
+            continue
+        entry["calls"] += 1
+        entry["prompt_tokens"] += call.prompt_tokens
+        entry["completion_tokens"] += call.completion_tokens
+        entry["latency"] += call.latency
+        entry["avg_time_to_first_token"] += call.time_to_first_token
+    for entry in summary.values():
+        if entry["calls"]:
+            entry["avg_latency"] = round(entry["latency"] / entry["calls"], 3)
+            entry["avg_time_to_first_token"] = round(entry["avg_time_to_first_token"] / entry["calls"], 3)
+        entry["latency"] = round(entry["latency"], 3)
+    return summary
+
+class AsyncLLMClient:
+    """LLM çağrılarını tek bir arka plan event loop'unda, sınırlı eşzamanlılıkla çalıştırır.
+
+    Sağlayıcı istemcisi (ChatMistralAI'nin httpx havuzu veya AsyncOllamaAPI) hep aynı loop'ta
+    kullanıldığı için keep-alive bağlantılar çağrılar arasında korunur.
+    """
+
+    def __init__(self, backend, max_in_flight: int = 4, rate_limiter: AdaptiveRateLimiter = None, max_retries: int = 5, base_backoff: float = 1.0, max_backoff: float = 60.0, log_callback=None):
+        self.backend = backend
+        # Tekrar denemeleri bu callback ile loglanır (message, level)
+        self.log_callback = log_callback
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.retry_count = 0
+        self._loop = asyncio.new_event_loop()
+        self._semaphore = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-event-loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        """Coroutine'i arka plan loop'una gönderir ve concurrent.futures.Future döndürür."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _call_with_retries(self, messages: list, call, can_retry=None):
+        """call() coroutine'ini hız sınırı, eşzamanlılık sınırı ve tekrar politikasıyla çalıştırır.
+
+        Hız sınırı (429), sunucu ve bağlantı hataları jitter'lı üstel bekleme ile tekrar denenir;
+        bu tekrarlar test düzeltme denemelerinden sayılmaz.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_in_flight)
+        estimated_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+
+        for retry in range(self.max_retries + 1):
+            await self.rate_limiter.acquire(estimated_tokens)
+            try:
+                async with self._semaphore:
+                    response = await call()
+            except Exception as e:
+                retryable, retry_after, status = classify_llm_error(e)
+                if not retryable or retry >= self.max_retries or (can_retry and not can_retry()):
+                    raise
+                if status == 429 and self.rate_limiter.on_rate_limited(retry_after) and self.log_callback:
+                    self.log_callback(
+                        f"Hız sınırı verilmedi (--rpm/--tpm); gözlenen hızdan {self.rate_limiter.requests_per_minute} istek/dakika "
+                        "bütçesiyle yavaşlatılıyor.",
+                        "warning"
+                    )
+                # Full jitter: aynı anda reddedilen istekler aynı anda geri dönmesin
+                delay = random.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** retry))
+                if retry_after:
+                    delay = max(delay, retry_after)
+                self.retry_count += 1
+                if self.log_callback:
+                    self.log_callback(f"LLM isteği tekrar denenecek ({retry + 1}/{self.max_retries}, {delay:.1f} sn): {str(e)}", "warning")
+                await asyncio.sleep(delay)
+                continue
+
+            actual_tokens = sum(response_token_usage(response))
+            self.rate_limiter.on_success(actual_tokens - estimated_tokens if actual_tokens else 0)
+            return response
+
+    async def ainvoke(self, messages: list, **kwargs):
+        """Hız sınırına uyarak ve en fazla max_in_flight eşzamanlı istekle backend'i çağırır."""
+        return await self._call_with_retries(messages, lambda: self.backend.ainvoke(messages, **kwargs))
+
+    async def astream(self, messages: list, on_text=None, should_stop=None, **kwargs) -> AIMessage:
+        """Yanıtı akış halinde alır; parçaları on_text'e iletir, should_stop True dönünce akışı keser.
+
+        Dönen AIMessage'ın response_metadata'sında ilk parçanın gelme süresi
+        (time_to_first_token) bulunur. Metin iletilmeye başladıktan sonra oluşan hatalar tekrar denenmez.
+        """
+        state = {"emitted": False}
+
+        async def stream_once():
+            started = time.time()
+            first_token_at = None
+            parts = []
+            usage_metadata = None
+            token_usage = None
+            chunks = self.backend.astream(messages, **kwargs)
+            try:
+                async for chunk in chunks:
+                    usage_metadata = getattr(chunk, "usage_metadata", None) or usage_metadata
+                    token_usage = (getattr(chunk, "response_metadata", None) or {}).get("token_usage") or token_usage
+                    delta = str(chunk.content or "")
+                    if not delta:
+                        continue
+                    if first_token_at is None:
+                        first_token_at = time.time()
+                    parts.append(delta)
+                    state["emitted"] = True
+                    if on_text:
+                        on_text(delta)
+                    if should_stop and should_stop(delta):
+                        break
+            finally:
+                # Erken çıkışta bağlantıyı kapatıp sunucunun üretimi bırakmasını sağla
+                await chunks.aclose()
+
+            metadata = {"time_to_first_token": round((first_token_at or time.time()) - started, 3)}
+            if token_usage:
+                metadata["token_usage"] = token_usage
+            return AIMessage(content="".join(parts), response_metadata=metadata, usage_metadata=usage_metadata)
+
+        return await self._call_with_retries(messages, stream_once, can_retry=lambda: not state["emitted"])
+
+    def result(self, future, cancel_event: threading.Event = None):
+        """Future'ın sonucunu bekler; cancel_event set edilirse isteği iptal edip CancelledError yükseltir.
+
+        İptal, loop'taki görevi de iptal eder; akış bağlantısı kapanır ve sunucu üretimi bırakır.
+        """
+        while cancel_event is not None and not future.done():
+            if wait([future], timeout=0.1).done:
+                break
+            if cancel_event.is_set():
+                future.cancel()
+                raise CancelledError()
+        return future.result()
+
+    def invoke(self, messages: list, cancel_event: threading.Event = None, **kwargs):
+        """Senkron çağıranlar için: isteği loop'a gönderir ve sonucu bekler."""
+        return self.result(self.submit(self.ainvoke(messages, **kwargs)), cancel_event)
+
+    def stream(self, messages: list, on_text=None, should_stop=None, cancel_event: threading.Event = None, **kwargs):
+        """Senkron çağıranlar için astream; on_text event loop thread'inden çağrılır."""
+        return self.result(self.submit(self.astream(messages, on_text=on_text, should_stop=should_stop, **kwargs)), cancel_event)
+
+    def gather(self, message_lists: list) -> list:
+        """Birden çok isteği aynı anda gönderir; hatalar istisna nesnesi olarak döner."""
+        async def run_all():
+            return await asyncio.gather(*(self.ainvoke(messages) for messages in message_lists), return_exceptions=True)
+        return self.submit(run_all()).result()
+
+    def close(self):
+        """Bağlantıları kapatır ve event loop'u durdurur."""
+        if not self._loop.is_running():
+            return
+        aclose = getattr(self.backend, "aclose", None)
+        if aclose:
+            try:
+                self.submit(aclose()).result(timeout=10)
+            except Exception:
+                pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=10)
+
+# MSBuild/NuGet hata satırları: "... error CS1002: ...", "... : error NU1101: ..."
+ERROR_LINE_PATTERN = re.compile(r'\berror\s+[A-Z]+\d+\s*:', re.IGNORECASE)
+
+class StreamedProcessResult:
+    """Akış halinde çalıştırılan komutun özeti; tam çıktı diskteki log dosyasındadır."""
+
+    def __init__(self, returncode: int, stdout_tail: deque, stderr_tail: deque, error_lines: List[str], log_path: Path, aborted: bool):
+        self.returncode = returncode
+        self.stdout_tail = stdout_tail
+        self.stderr_tail = stderr_tail
+        self.error_lines = error_lines
+        self.log_path = log_path
+        self.aborted = aborted
+
+    @property
+    def stdout(self) -> str:
+        """Standart çıktının son satırları."""
+        return "\n".join(self.stdout_tail)
+
+    @property
+    def stderr(self) -> str:
+        """Hata çıktısının son satırları."""
+        return "\n".join(self.stderr_tail)
+
+def terminate_process_tree(process: subprocess.Popen, kill_tree: bool = True):
+    """Süreci alt süreçleriyle (testhost, MSBuild düğümleri) birlikte sonlandırır.
+
+    Alt süreçler çıktı borularını açık tuttuğu için yalnızca ana süreci durdurmak genelde yetmez.
+    kill_tree False ise yalnızca ana süreç durdurulur; paylaşılan MSBuild düğümleri ve derleyici
+    sunucusu aynı süreç grubunda olduğundan sıcak tutulan build'lerde böyle yapılır.
+    """
+    if process.poll() is not None:
+        return
+    if not kill_tree:
+        process.kill()
+        return
+    try:
+        if os.name == "nt":
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+    except (OSError, subprocess.SubprocessError):
+        process.terminate()
+
+def run_streaming(command: list, cwd: Path = None, log_path: Path = None, max_errors: int = None, tail_size: int = 400, cancel_event: threading.Event = None, env: dict = None, kill_tree: bool = True) -> StreamedProcessResult:
+    """Komutu çalıştırır; çıktıyı satır satır log dosyasına yazar, hata satırlarını geldikçe ayıklar.
+
+    cancel_event set edilirse süreç sonlandırılır ve sonuç aborted olarak döner.
+    env verilirse mevcut ortam değişkenlerine eklenir. kill_tree False ise durdurulurken
+    yalnızca ana süreç sonlandırılır (bkz. terminate_process_tree).
+    """
+    process = subprocess.Popen(
+        command,
+        cwd=cwd,
+        env={**os.environ, **env} if env else None,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        bufsize=1,
+        # Süreç ağacı birlikte sonlandırılabilsin diye ayrı süreç grubunda başlatılır
+        start_new_session=os.name != "nt"
+    )
+
+    lock = threading.Lock()
+    stdout_tail = deque(maxlen=tail_size)
+    stderr_tail = deque(maxlen=tail_size)
+    error_lines = []
+    seen_errors = set()
+    state = {"aborted": False}
+
+    log_file = None
+    if log_path:
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        log_file = open(log_path, 'w', encoding='utf-8')
+
+    def read_stream(stream, tail: deque):
+        for raw_line in stream:
+            line = raw_line.rstrip('\r\n')
+            with lock:
+                if log_file:
+                    log_file.write(line + '\n')
+                tail.append(line)
+
+                # MSBuild hataları hem satır içinde hem özette yazar, tekrarları atla
+                if ERROR_LINE_PATTERN.search(line):
+                    error_line = line.strip()
+                    if error_line not in seen_errors:
+                        seen_errors.add(error_line)
+                        error_lines.append(error_line)
+
+                # Yeterli hata toplandıysa build'in bitmesini bekleme
+                if max_errors and len(error_lines) >= max_errors and not state["aborted"]:
+                    state["aborted"] = True
+                    terminate_process_tree(process, kill_tree)
+
+    stderr_thread = threading.Thread(target=read_stream, args=(process.stderr, stderr_tail), daemon=True)
+    stderr_thread.start()
+
+    def watch_cancel():
+        while process.poll() is None:
+            if cancel_event.wait(0.2):
+                with lock:
+                    state["aborted"] = True
+                terminate_process_tree(process, kill_tree)
+                return
+
+    if cancel_event is not None:
+        threading.Thread(target=watch_cancel, daemon=True).start()
+    try:
+        read_stream(process.stdout, stdout_tail)
+        stderr_thread.join()
+        returncode = process.wait()
+    finally:
+        # Kesintide (ör. Ctrl+C) ayrı gruptaki süreçler geride kalmasın
+        terminate_process_tree(process, kill_tree)
+        if log_file:
+            log_file.close()
+
+    # Erken durdurulan build'in dönüş kodu başarılı görünmemeli
+    if state["aborted"] and returncode == 0:
+        returncode = 1
+
+    return StreamedProcessResult(returncode, stdout_tail, stderr_tail, error_lines, log_path, state["aborted"])
+
+class BuildExecutor:
+    """dotnet build çağrılarını sıcak tutulan MSBuild düğümleri ve derleyici sunucusuyla çalıştırır.
+
+    Düğüm yeniden kullanımı (nodeReuse), MSBuild sunucusu ve paylaşımlı derleyici (VBCSCompiler)
+    açıkça etkinleştirilir; böylece ardışık build'ler süreç başlatma ve proje değerlendirmesini
+    tekrar ödemez. Sunucuların durumu dışarıdan sorgulanamadığı için build'in sıcak mı soğuk mu
+    başladığı tahmin edilir: çalıştırmanın ilk build'i, boşta kalma süresi aşıldıktan sonraki
+    build'ler ve o ana kadarkinden daha fazla eşzamanlı build soğuk sayılır. İptal edilen veya
+    erken durdurulan build'lerde yalnızca dotnet sürücüsü sonlandırılır; paylaşılan düğümler
+    diğer build'ler için ayakta kalır.
+    """
+
+    # MSBuild düğümleri ve VBCSCompiler boşta birkaç dakika kaldıktan sonra kendiliğinden kapanır
+    IDLE_TIMEOUT = 600
+    WARM_ENV = {
+        "DOTNET_CLI_USE_MSBUILD_SERVER": "1",
+        "MSBUILDDISABLENODEREUSE": "0",
+        "DOTNET_CLI_TELEMETRY_OPTOUT": "1",
+        "DOTNET_SKIP_FIRST_TIME_EXPERIENCE": "1",
+        "DOTNET_NOLOGO": "1"
+    }
+
+    def __init__(self, keep_warm: bool = True):
+        self.keep_warm = keep_warm
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Çalıştırma istatistiklerini sıfırlar; sunucular soğuk kabul edilir."""
+        with self._lock:
+            self.builds = []
+            self._in_flight = 0
+            self._warm_nodes = 0
+            self._last_finished = None
+
+    def command(self, command: list) -> list:
+        """Build komutuna düğüm yeniden kullanımı ve paylaşımlı derleme ayarlarını ekler."""
+        if self.keep_warm:
+            return command + ["-nodeReuse:true", "-p:UseSharedCompilation=true"]
+        return command + ["-nodeReuse:false", "-p:UseSharedCompilation=false"]
+
+    def run(self, command: list, **kwargs) -> StreamedProcessResult:
+        """Build'i çalıştırır ve süresini sıcak/soğuk olarak kaydeder; argümanlar run_streaming'e geçer."""
+        with self._lock:
+            self._in_flight += 1
+            idle = self._last_finished is None or time.monotonic() - self._last_finished > self.IDLE_TIMEOUT
+            warm = self.keep_warm and not idle and self._in_flight <= self._warm_nodes
+        started = time.monotonic()
+        try:
+            # Düğümler diğer işçilerin build'leriyle paylaşıldığından iptal/erken durdurmada yalnızca
+            # dotnet sürücüsü sonlandırılır
+            result = run_streaming(
+                self.command(command),
+                env=self.WARM_ENV if self.keep_warm else None,
+                kill_tree=not self.keep_warm,
+                **kwargs
+            )
+        finally:
+            with self._lock:
+                duration = time.monotonic() - started
+                self._warm_nodes = max(self._warm_nodes, self._in_flight)
+                self._in_flight -= 1
+                self._last_finished = time.monotonic()
+        with self._lock:
+            self.builds.append({"warm": warm, "duration": round(duration, 3), "returncode": result.returncode})
+        return result
+
+    def summary(self) -> dict:
+        """Sıcak ve soğuk build sayılarını ve ortalama sürelerini döndürür."""
+        with self._lock:
+            builds = list(self.builds)
+        summary = {"keep_warm": self.keep_warm, "builds": len(builds)}
+        for state, warm in (("warm", True), ("cold", False)):
+            durations = [build["duration"] for build in builds if build["warm"] == warm]
+            summary[state] = len(durations)
+            summary[f"{state}_avg_duration"] = round(sum(durations) / len(durations), 3) if durations else None
+        return summary
+
+    def shutdown(self, log_callback=None):
+        """Çalıştırma sonunda MSBuild düğümlerini, MSBuild sunucusunu ve derleyici sunucusunu kapatır."""
+        if not self.keep_warm or not self.builds:
+            return
+        try:
+            result = subprocess.run(
+                ["dotnet", "build-server", "shutdown"],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                timeout=60
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            if log_callback:
+                log_callback(f"Build sunucuları kapatılamadı: {str(e)}", "warning")
+            return
+        if log_callback:
+            if result.returncode == 0:
+                log_callback("Build sunucuları kapatıldı.", "info")
+            else:
+                log_callback(f"Build sunucuları kapatılamadı: {result.stderr.strip()}", "warning")
+
+def skip_csharp_literal(source: str, index: int) -> int:
+    """index'te string, karakter veya yorum başlıyorsa bitişinin sonraki konumunu, yoksa index'i döndürür."""
+    char = source[index]
+    next_char = source[index + 1] if index + 1 < len(source) else ""
+
+    if char == '/' and next_char == '/':
+        end = source.find('\n', index)
+        return len(source) if end == -1 else end
+    if char == '/' and next_char == '*':
+        end = source.find('*/', index + 2)
+        return len(source) if end == -1 else end + 2
+    if char == "'":
+        # Karakter literali satır sonunu geçemez; kapanmamışsa satır sonunda biter
+        i = index + 1
+        while i < len(source) and source[i] not in "'\n":
+            i += 2 if source[i] == '\\' else 1
+        return i + 1 if i < len(source) and source[i] == "'" else min(i, len(source))
+
+    # String önekleri: @"...", $"...", $@"...", @$"...", ham string """..."""
+    i = index
+    verbatim = False
+    while i < len(source) and source[i] in '@$':
+        verbatim = verbatim or source[i] == '@'
+        i += 1
+    if i >= len(source) or source[i] != '"':
+        return index
+    if source.startswith('"""', i):
+        quote_count = 3
+        while i + quote_count < len(source) and source[i + quote_count] == '"':
+            quote_count += 1
+        end = source.find('"' * quote_count, i + quote_count)
+        return len(source) if end == -1 else end + quote_count
+    i += 1
+    while i < len(source):
+        if verbatim and source[i] == '"' and source[i + 1:i + 2] == '"':
+            i += 2
+        elif not verbatim and source[i] == '\\':
+            i += 2
+        elif source[i] == '"':
+            return i + 1
+        elif source[i] == '\n' and not verbatim:
+            return i
+        else:
+            i += 1
+    return len(source)
+
+CSHARP_TOKEN_PATTERN = re.compile(r'@?[A-Za-z_]\w*|\d[\w\.]*|\S')
+CSHARP_WHITESPACE_PATTERN = re.compile(r'\s+')
+# String, karakter veya yorum başlatabilecek karakterler
+CSHARP_LITERAL_STARTS = frozenset('/\'"@$')
+
+def tokenize_csharp(source: str) -> tuple:
+    """C# kaynağını (tür, metin, satır, sütun, konum) token'larına ayırır; yorumlar atlanır.
+
+    Tür "identifier", "number", "string" veya "punct" olur. İkinci değer kapanmamış
+    string/karakter/yorum literallerinin (satır, sütun, açıklama) listesidir.
+    """
+    tokens = []
+    literal_errors = []
+    i = 0
+    line = 1
+    line_start = 0
+    length = len(source)
+    while i < length:
+        # Boşluklar tek regex eşleşmesiyle atlanır
+        whitespace = CSHARP_WHITESPACE_PATTERN.match(source, i)
+        if whitespace:
+            newlines = whitespace.group(0).count('\n')
+            if newlines:
+                line += newlines
+                line_start = i + whitespace.group(0).rfind('\n') + 1
+            i = whitespace.end()
+            if i >= length:
+                break
+
+        column = i - line_start + 1
+        skipped = skip_csharp_literal(source, i) if source[i] in CSHARP_LITERAL_STARTS else i
+        if skipped != i:
+            text = source[i:skipped]
+            if text.startswith('/*') and not text.endswith('*/'):
+                literal_errors.append((line, column, "Unterminated block comment"))
+            elif text.startswith("'") and (len(text) < 2 or not text.endswith("'")):
+                literal_errors.append((line, column, "Unterminated character literal"))
+            elif not text.startswith('/') and not text.startswith("'") and (len(text.lstrip('@$')) < 2 or not text.endswith('"')):
+                literal_errors.append((line, column, "Unterminated string literal"))
+            if not text.startswith('/'):
+                tokens.append(("string", text, line, column, i))
+            newlines = text.count('\n')
+            if newlines:
+                line += newlines
+                line_start = i + text.rfind('\n') + 1
+            i = min(skipped, length)
+            continue
+
+        match = CSHARP_TOKEN_PATTERN.match(source, i)
+        text = match.group(0)
+        first = text[0]
+        if first.isalpha() or first in '_@':
+            kind = "identifier"
+        elif first.isdigit():
+            kind = "number"
+        else:
+            kind = "punct"
+        tokens.append((kind, text, line, column, i))
+        i = match.end()
+    return tokens, literal_errors
+
+# Üst düzeyde (namespace/tip bildirimi dışında) bir ifadeye başlayabilecek token'lar
+CSHARP_TOP_LEVEL_STARTS = {
+    'using', 'namespace', 'global', 'extern', '[', '#', 'public', 'internal', 'private', 'protected',
+    'static', 'sealed', 'abstract', 'partial', 'file', 'unsafe', 'readonly', 'class', 'record',
+    'struct', 'interface', 'enum', 'delegate'
+}
+
+def validate_csharp_structure(source: str) -> List[tuple]:
+    """Üretilen test kodunda derlemeden önce yakalanabilecek yapısal hataları bulur.
+
+    Dengesiz parantezler, kapanmamış literaller, kod dışı açıklama metni ve eksik
+    namespace/sınıf/[Fact] bildirimlerini (satır, sütun, kod, mesaj) listesi olarak döndürür.
+    """
+    tokens, literal_errors = tokenize_csharp(source)
+    errors = [(line, column, "TG0001", message) for line, column, message in literal_errors]
+
+    pairs = {'}': '{', ')': '(', ']': '['}
+    stack = []
+    depth = 0
+    statement_start = True
+    directive_line = None
+    prose_errors = 0
+    for index, (kind, text, line, column, _) in enumerate(tokens):
+        # Önişlemci yönergeleri (#nullable vb.) satır sonuna kadar yok sayılır
+        if directive_line == line:
+            continue
+        if depth == 0 and statement_start and kind != "string":
+            if text == '#':
+                directive_line = line
+                continue
+            if text not in CSHARP_TOP_LEVEL_STARTS and text != '}' and prose_errors < 2:
+                source_line = source.splitlines()[line - 1].strip()
+                errors.append((line, column, "TG0002", f"Unexpected text outside of a namespace or type declaration: '{source_line[:80]}'"))
+                prose_errors += 1
+        statement_start = False
+
+        if kind != "punct":
+            continue
+        if text in '{([':
+            stack.append((text, line, column))
+            if text == '{':
+                depth += 1
+        elif text in pairs:
+            if not stack or stack[-1][0] != pairs[text]:
+                errors.append((line, column, "TG0003", f"Unexpected '{text}'" + (f", '{stack[-1][0]}' opened at line {stack[-1][1]} is not closed" if stack else "")))
+                if stack and pairs[text] in [opened for opened, _, _ in stack]:
+                    # Eksik kapanışı atlayıp eşleşen açılışa dön
+                    while stack[-1][0] != pairs[text]:
+                        stack.pop()
+                else:
+                    continue
+            stack.pop()
+            if text == '}':
+                depth = max(0, depth - 1)
+                statement_start = depth == 0
+            elif text == ']' and depth == 0:
+                statement_start = True
+        elif text == ';' and depth == 0:
+            statement_start = True
+
+    for opened, line, column in stack:
+        errors.append((line, column, "TG0003", f"'{opened}' is never closed"))
+
+    identifiers = {token[1] for token in tokens if token[0] == "identifier"}
+    if "namespace" not in identifiers:
+        errors.append((1, 1, "TG0004", "Missing namespace declaration"))
+    if "class" not in identifiers:
+        errors.append((1, 1, "TG0004", "Missing test class declaration"))
+    has_test_attribute = any(
+        token[0] == "identifier" and token[1] in ("Fact", "Theory") and index > 0 and tokens[index - 1][1] in ('[', ',', '.')
+        for index, token in enumerate(tokens)
+    )
+    if not has_test_attribute:
+        errors.append((1, 1, "TG0004", "No test method marked with [Fact] or [Theory]"))
+    return sorted(errors)
+
+CSHARP_MEMBER_MODIFIERS = {
+    'public', 'private', 'protected', 'internal', 'static', 'async', 'virtual', 'override', 'sealed',
+    'abstract', 'new', 'extern', 'unsafe', 'partial', 'readonly', 'volatile', 'const', 'required', 'file'
+}
+CSHARP_TYPE_KEYWORDS = {'class', 'struct', 'interface', 'enum', 'record', 'delegate'}
+CSHARP_BUILTIN_TYPES = {
+    'bool', 'byte', 'sbyte', 'char', 'decimal', 'double', 'float', 'int', 'uint', 'long', 'ulong', 'short',
+    'ushort', 'string', 'object', 'nint', 'nuint', 'dynamic', 'String', 'Guid', 'DateTime', 'TimeSpan'
+}
+
+@dataclass
+class CSharpMember:
+    """Bir tipin üyesi (metod, constructor, property, alan, event, indexer, operatör)."""
+    kind: str
+    name: str
+    return_type: str = ""
+    parameters: str = ""
+    modifiers: List[str] = field(default_factory=list)
+    type_parameters: str = ""
+    constraints: str = ""
+    expression_bodied: bool = False
+    line: int = 0
+    # Property/indexer erişimcileri, ör. "get; private set;"
+    accessors: str = ""
+    # Kaynaktaki [start, end) karakter aralığı (öznitelikler hariç, gövde dahil)
+    start: int = -1
+    end: int = -1
+
+@dataclass
+class CSharpType:
+    """Sınıf, record, struct, interface, enum veya delegate bildirimi."""
+    kind: str
+    name: str
+    namespace: str = None
+    modifiers: List[str] = field(default_factory=list)
+    type_parameters: str = ""
+    base_types: List[str] = field(default_factory=list)
+    constraints: str = ""
+    primary_constructor: str = None
+    parent: str = None
+    members: List[CSharpMember] = field(default_factory=list)
+    enum_values: List[str] = field(default_factory=list)
+    line: int = 0
+    # Bildirim başlığının ('{' öncesine kadar) kaynaktaki [start, end) karakter aralığı
+    header_start: int = -1
+    header_end: int = -1
+
+    @property
+    def full_name(self) -> str:
+        name = f"{self.parent}.{self.name}" if self.parent else self.name
+        return f"{self.namespace}.{name}" if self.namespace else name
+
+@dataclass
+class CSharpOutline:
+    """Kaynak dosyanın namespace, using ve tip özeti."""
+    namespaces: List[str] = field(default_factory=list)
+    using_statements: List[str] = field(default_factory=list)
+    types: List[CSharpType] = field(default_factory=list)
+
+def split_csharp_parameters(parameters: str) -> List[tuple]:
+    """Parametre listesini (tip, ad) çiftlerine ayırır; varsayılan değerler ve niteleyiciler atılır."""
+    result = []
+    depth = 0
+    current = ""
+    for char in parameters + ",":
+        if char in "<([{":
+            depth += 1
+        elif char in ">)]}" and not (char == ">" and current.endswith("=")):
+            depth -= 1
+        if char == "," and depth == 0:
+            parameter = re.sub(r'^\s*(?:\[[^\]]*\]\s*)*', '', current)
+            parameter = re.split(r'\s*=(?!>)', parameter, maxsplit=1)[0].strip()
+            parameter = re.sub(r'^(?:(?:this|ref|out|in|params|scoped|readonly)\s+)+', '', parameter)
+            match = re.match(r'^(.+?)\s*\b(@?\w+)$', parameter)
+            if match:
+                result.append((match.group(1).strip(), match.group(2)))
+            current = ""
+        else:
+            current += char
+    return result
+
+def parse_csharp_outline(source: str) -> CSharpOutline:
+    """C# kaynağını tek geçişte tarayıp namespace, tip ve üye özetini çıkarır.
+
+    Token'lar bir kez üretilir ve parantez eşleri bir yığınla önceden bulunur; metod ve
+    property gövdeleri bu eşlerle atlandığı için dosya boyutuna göre doğrusal çalışır.
+    """
+    outline = CSharpOutline()
+    tokens, _ = tokenize_csharp(source)
+    count = len(tokens)
+
+    # Açılış -> kapanış token indeksleri
+    partner = {}
+    stack = []
+    closers = {'}': '{', ')': '(', ']': '['}
+    for index, token in enumerate(tokens):
+        if token[0] != "punct":
+            continue
+        if token[1] in '{([':
+            stack.append(index)
+        elif token[1] in closers:
+            while stack and tokens[stack[-1]][1] != closers[token[1]]:
+                stack.pop()
+            if stack:
+                partner[stack.pop()] = index
+
+    def text_of(start: int, end: int) -> str:
+        """[start, end) token aralığının kaynak metnini tek satıra indirger."""
+        if start >= end:
             return ""
+        last = tokens[end - 1]
+        return re.sub(r'\s+', ' ', source[tokens[start][4]:last[4] + len(last[1])]).strip()
+
+    def end_offset(index: int) -> int:
+        """index'teki token'ın kaynakta bittiği konum."""
+        return tokens[index][4] + len(tokens[index][1])
+
+    def is_arrow(index: int) -> bool:
+        return (index + 1 < count and tokens[index][1] == '=' and tokens[index + 1][1] == '>'
+                and tokens[index + 1][4] == tokens[index][4] + 1)
+
+    def skip_to_semicolon(index: int) -> int:
+        """index'ten itibaren iç içe olmayan ';' token'ının indeksini döndürür."""
+        while index < count and tokens[index][1] != ';':
+            if index in partner:
+                index = partner[index]
+            elif tokens[index][1] == '}':
+                # Kapsayan bloğun sonuna gelindi
+                return index - 1
+            index += 1
+        return index
+
+    def parse_type_header(header: List[int], modifiers: List[str], namespace: str, parent: CSharpType) -> CSharpType:
+        keyword_index = header[0]
+        kind = tokens[keyword_index][1]
+        position = 1
+        if kind == "record" and position < len(header) and tokens[header[position]][1] in ("struct", "class"):
+            kind = f"record {tokens[header[position]][1]}" if tokens[header[position]][1] == "struct" else "record"
+            position += 1
+        name = tokens[header[position]][1] if position < len(header) else ""
+        position += 1
+        declared = CSharpType(kind=kind, name=name, namespace=namespace, modifiers=modifiers, line=tokens[keyword_index][2],
+                              parent=parent.name if parent else None)
+        if position < len(header) and tokens[header[position]][1] == '<':
+            depth = 0
+            start = position
+            while position < len(header):
+                depth += {'<': 1, '>': -1}.get(tokens[header[position]][1], 0)
+                position += 1
+                if depth == 0:
+                    break
+            declared.type_parameters = text_of(header[start], header[position - 1] + 1)
+        if position < len(header) and header[position] in partner and tokens[header[position]][1] == '(':
+            close = partner[header[position]]
+            declared.primary_constructor = text_of(header[position] + 1, close)
+            while position < len(header) and header[position] <= close:
+                position += 1
+        rest = text_of(header[position], header[-1] + 1) if position < len(header) else ""
+        rest, _, constraints = rest.partition(" where ")
+        if rest.startswith("where "):
+            rest, constraints = "", rest[len("where "):]
+        declared.constraints = constraints.strip()
+        if rest.startswith(":"):
+            bases = []
+            depth = 0
+            current = ""
+            for char in rest[1:] + ",":
+                depth += {'<': 1, '>': -1, '(': 1, ')': -1}.get(char, 0)
+                if char == "," and depth == 0:
+                    bases.append(re.sub(r'\(.*\)$', '', current.strip()))
+                    current = ""
+                else:
+                    current += char
+            declared.base_types = [base for base in bases if base]
+        return declared
+
+    def parse_member(header: List[int], modifiers: List[str], terminator: str, owner: CSharpType) -> CSharpMember:
+        line = tokens[header[0]][2]
+        header_text = [tokens[index][1] for index in header]
+        if "operator" in header_text:
+            operator_index = header_text.index("operator")
+            open_index = next((i for i in range(operator_index, len(header)) if header_text[i] == '('), None)
+            name = "operator " + " ".join(header_text[operator_index + 1:open_index])
+            parameters = text_of(header[open_index] + 1, partner.get(header[open_index], header[open_index])) if open_index is not None else ""
+            return CSharpMember("operator", name.strip(), text_of(header[0], header[operator_index]), parameters, modifiers, line=line,
+                                expression_bodied=terminator == "=>")
+
+        # Metod adı, önünde tanımlayıcı ya da generic parametre kapanışı olan ilk '(' ile bulunur;
+        # tuple dönüş tiplerindeki parantezler atlanır
+        position = 0
+        angle = 0
+        while position < len(header):
+            text = header_text[position]
+            if text == '<':
+                angle += 1
+            elif text == '>':
+                angle -= 1
+            elif text == '(' and angle == 0:
+                previous = header_text[position - 1] if position else ""
+                if position and (tokens[header[position - 1]][0] == "identifier" and previous not in CSHARP_MEMBER_MODIFIERS or previous == '>'):
+                    break
+                close = partner.get(header[position], header[position])
+                while position < len(header) and header[position] < close:
+                    position += 1
+            elif text == '=' and angle == 0:
+                # Alan başlatıcısı
+                position = len(header)
+                break
+            position += 1
+
+        if position < len(header):
+            name_index = position - 1
+            type_parameters = ""
+            if header_text[name_index] == '>':
+                depth = 0
+                close_index = name_index
+                while name_index > 0:
+                    depth += {'>': 1, '<': -1}.get(header_text[name_index], 0)
+                    name_index -= 1
+                    if depth == 0:
+                        break
+                type_parameters = text_of(header[name_index + 1], header[close_index] + 1)
+            name = header_text[name_index]
+            qualifier_index = name_index
+            while qualifier_index >= 2 and header_text[qualifier_index - 1] == '.':
+                qualifier_index -= 2
+            close = partner.get(header[position], header[position])
+            parameters = text_of(header[position] + 1, close)
+            after = [index for index in header if index > close]
+            constraints = ""
+            if after and tokens[after[0]][1] == "where":
+                constraints = text_of(after[1], after[-1] + 1) if len(after) > 1 else ""
+            return_type = text_of(header[0], header[qualifier_index]) if qualifier_index > 0 else ""
+            if name == owner.name and not return_type:
+                kind = "constructor"
+            elif name == owner.name and return_type == "~":
+                kind, return_type = "finalizer", ""
+            elif "delegate" in modifiers:
+                kind = "delegate"
+            else:
+                kind = "method"
+            return CSharpMember(kind, name, return_type, parameters, modifiers, type_parameters, constraints,
+                                terminator == "=>", line)
+
+        # Property, indexer, event veya alan
+        cut = len(header)
+        for i, text in enumerate(header_text):
+            if text == '=' and not is_arrow(header[i]):
+                cut = i
+                break
+        declaration = header_text[:cut]
+        if "this" in declaration and '[' in declaration:
+            this_index = declaration.index("this")
+            close = partner.get(header[this_index + 1], header[this_index + 1])
+            return CSharpMember("indexer", "this", text_of(header[0], header[this_index]), text_of(header[this_index + 1] + 1, close),
+                                modifiers, expression_bodied=terminator == "=>", line=line)
+        if not declaration:
+            return None
+        name_index = max(i for i, index in enumerate(header[:cut]) if tokens[index][0] == "identifier") if any(
+            tokens[index][0] == "identifier" for index in header[:cut]) else None
+        if name_index is None:
+            return None
+        # Çoklu bildirim (int a, b;) için ilk ad alınır
+        if ',' in declaration:
+            comma = declaration.index(',')
+            name_index = max(i for i in range(comma) if tokens[header[i]][0] == "identifier")
+        is_event = "event" in declaration
+        type_start = declaration.index("event") + 1 if is_event else 0
+        if terminator == ';':
+            kind = "event" if is_event else "field"
+        else:
+            kind = "event" if is_event else "property"
+        return CSharpMember(kind, header_text[name_index], text_of(header[type_start], header[name_index]), "", modifiers,
+                            expression_bodied=terminator == "=>", line=line)
+
+    def parse_block(index: int, end: int, namespace: str, owner: CSharpType):
+        """[index, end) aralığındaki bildirimleri işler (namespace veya tip gövdesi)."""
+        while index < end:
+            token = tokens[index]
+            text = token[1]
+            if text in (';', '}'):
+                index += 1
+                continue
+            # Öznitelikler ve önişlemci yönergeleri
+            if text == '[' and index in partner:
+                index = partner[index] + 1
+                continue
+            if text == '#':
+                line = token[2]
+                while index < end and tokens[index][2] == line:
+                    index += 1
+                continue
+            if owner is None and text in ("using", "global"):
+                semicolon = skip_to_semicolon(index)
+                statement = text_of(index, semicolon)
+                match = re.match(r'^(?:global\s+)?using\s+(?:static\s+)?(?:\w+\s*=\s*)?([\w\.<>, ]+)$', statement)
+                if match and "(" not in statement:
+                    outline.using_statements.append(match.group(1).strip())
+                index = semicolon + 1
+                continue
+            if owner is None and text == "namespace":
+                position = index + 1
+                while position < end and tokens[position][1] not in ('{', ';'):
+                    position += 1
+                name = text_of(index + 1, position)
+                if namespace:
+                    name = f"{namespace}.{name}"
+                outline.namespaces.append(name)
+                if position < end and tokens[position][1] == '{':
+                    close = partner.get(position, end)
+                    parse_block(position + 1, close, name, None)
+                    index = close + 1
+                else:
+                    # File-scoped namespace dosyanın geri kalanını kapsar
+                    namespace = name
+                    index = position + 1
+                continue
+
+            # Başlık: terminatöre ('{', ';' veya '=>') kadar olan token'lar
+            header = []
+            modifiers = []
+            terminator = None
+            position = index
+            while position < end:
+                current = tokens[position][1]
+                if current == '{' or current == ';':
+                    terminator = current
+                    break
+                if is_arrow(position):
+                    terminator = "=>"
+                    break
+                if current == '}':
+                    break
+                if current == '[' and not header and position in partner:
+                    position = partner[position] + 1
+                    continue
+                if not header and current in CSHARP_MEMBER_MODIFIERS:
+                    modifiers.append(current)
+                elif current in ('(', '[') and position in partner:
+                    header.extend(range(position, partner[position] + 1))
+                    position = partner[position] + 1
+                    continue
+                else:
+                    header.append(position)
+                position += 1
+
+            if terminator is None:
+                index = max(position, index + 1)
+                continue
+
+            first = tokens[header[0]][1] if header else ""
+            is_type = first in CSHARP_TYPE_KEYWORDS and not (first == "record" and len(header) > 1 and tokens[header[1]][1] in ('(', '<'))
+            if is_type and first == "delegate":
+                delegate = parse_member(header[1:], modifiers + ["delegate"], terminator, CSharpType("delegate", ""))
+                if delegate:
+                    outline.types.append(CSharpType("delegate", delegate.name, namespace, modifiers, parent=owner.name if owner else None,
+                                                    primary_constructor=delegate.parameters, line=token[2]))
+                index = skip_to_semicolon(position) + 1
+                continue
+            if is_type:
+                declared = parse_type_header(header, modifiers, namespace, owner)
+                # Aynı dosyadaki partial parçaları birleştirilir
+                existing = next((t for t in outline.types if "partial" in modifiers and t.full_name == declared.full_name), None)
+                if existing is None:
+                    declared.header_start = tokens[index][4]
+                    declared.header_end = end_offset(position - 1)
+                    outline.types.append(declared)
+                else:
+                    declared = existing
+                if terminator == '{':
+                    close = partner.get(position, end)
+                    if declared.kind == "enum":
+                        # Enum değerleri: '{' veya ',' sonrasındaki ilk tanımlayıcılar
+                        expect_value = True
+                        value_index = position + 1
+                        while value_index < close:
+                            value_token = tokens[value_index]
+                            if value_token[1] == '[' and value_index in partner:
+                                value_index = partner[value_index] + 1
+                                continue
+                            if value_token[1] == ',':
+                                expect_value = True
+                            elif expect_value and value_token[0] == "identifier":
+                                declared.enum_values.append(value_token[1])
+                                expect_value = False
+                            value_index = partner.get(value_index, value_index) + 1
+                    else:
+                        parse_block(position + 1, close, namespace, declared)
+                    index = close + 1
+                else:
+                    index = position + 1
+                continue
+
+            member = None
+            member_start = index
+            if owner is not None and header:
+                member = parse_member(header, modifiers, terminator, owner)
+                if member:
+                    owner.members.append(member)
+                    if member.kind in ("property", "indexer"):
+                        if terminator == "=>":
+                            member.accessors = "get;"
+                        elif terminator == '{':
+                            # Erişimci gövdeleri atlanarak get/set/init ve erişim belirleyicileri toplanır
+                            accessors = []
+                            pending = []
+                            accessor_index = position + 1
+                            close = partner.get(position, end)
+                            while accessor_index < close:
+                                accessor_text = tokens[accessor_index][1]
+                                if accessor_text in ("get", "set", "init"):
+                                    accessors.append(" ".join(pending + [accessor_text]) + ";")
+                                    pending = []
+                                elif accessor_text in ("private", "protected", "internal"):
+                                    pending.append(accessor_text)
+                                elif is_arrow(accessor_index):
+                                    accessor_index = skip_to_semicolon(accessor_index)
+                                accessor_index = partner.get(accessor_index, accessor_index) + 1
+                            member.accessors = " ".join(accessors)
+
+            # Gövdeyi atla
+            if terminator == '{':
+                close = partner.get(position, end)
+                index = close + 1
+                # Property başlatıcısı: { get; set; } = değer;
+                if index < end and tokens[index][1] == '=' and not is_arrow(index):
+                    index = skip_to_semicolon(index) + 1
+            elif terminator == "=>":
+                index = skip_to_semicolon(position + 2) + 1
+            else:
+                index = position + 1
+            if member:
+                member.start = tokens[member_start][4]
+                member.end = end_offset(min(index, count) - 1)
+
+    parse_block(0, count, None, None)
+    return outline
+
+def render_type_signature(declared: CSharpType) -> str:
+    """Tipin gövdesiz imzasını (bildirim ve dışarıdan görünen üyeler) C# benzeri metin olarak üretir."""
+    header = " ".join(declared.modifiers + [declared.kind, declared.name]) + declared.type_parameters
+    if declared.primary_constructor is not None:
+        header += f"({declared.primary_constructor})"
+    if declared.base_types:
+        header += " : " + ", ".join(declared.base_types)
+    if declared.constraints:
+        header += f" where {declared.constraints}"
+    if declared.kind == "delegate":
+        return header + ";"
+    if declared.kind == "enum":
+        return header + " { " + ", ".join(declared.enum_values) + " }"
+
+    lines = []
+    for member in declared.members:
+        # Arayüz dışındaki tiplerde yalnızca dışarıdan erişilebilen üyeler
+        if declared.kind != "interface" and not {"public", "internal", "protected"} & set(member.modifiers):
+            continue
+        modifiers = " ".join(m for m in member.modifiers if m not in ("async", "partial", "unsafe", "extern"))
+        prefix = f"{modifiers} " if modifiers else ""
+        if member.kind == "constructor":
+            lines.append(f"{prefix}{member.name}({member.parameters});")
+        elif member.kind in ("method", "operator"):
+            where = f" where {member.constraints}" if member.constraints else ""
+            lines.append(f"{prefix}{member.return_type} {member.name}{member.type_parameters}({member.parameters}){where};")
+        elif member.kind == "property":
+            lines.append(f"{prefix}{member.return_type} {member.name} {{ {member.accessors or 'get;'} }}")
+        elif member.kind == "indexer":
+            lines.append(f"{prefix}{member.return_type} this[{member.parameters}] {{ {member.accessors or 'get;'} }}")
+        elif member.kind == "event":
+            lines.append(f"{prefix}event {member.return_type} {member.name};")
+        elif member.kind == "field":
+            lines.append(f"{prefix}{member.return_type} {member.name};")
+    if not lines:
+        return header + (";" if declared.primary_constructor is not None else " { }")
+    return header + "\n{\n    " + "\n    ".join(lines) + "\n}"
+
+PATCH_RESPONSE_INSTRUCTIONS = """Return ONLY a unified diff against the current test code above, nothing else:
+- Start each hunk with a header like: @@ -12,4 +12,5 @@
+- Prefix unchanged context lines with a space, removed lines with '-' and added lines with '+'
+- Include 2 unchanged context lines around each change, copied exactly from the current code
+- Do not repeat unchanged parts of the file outside the hunks"""
+
+HUNK_HEADER_PATTERN = re.compile(r'^@@\s*-(\d+)(?:,\d+)?\s+\+\d+(?:,\d+)?\s*@@')
+
+def parse_unified_diff(diff_text: str) -> list:
+    """Diff metnindeki hunk'ları (eski satır ipucu, [(işaret, satır), ...]) listesi olarak döndürür.
+
+    Dosya başlıkları ve hunk'lar dışındaki açıklama satırları yok sayılır; boş satırlar
+    atlanır çünkü kaydedilen test kodunda boş satır bulunmaz.
+    """
+    hunks = []
+    current = None
+    for line in diff_text.splitlines():
+        if line.startswith('---') or line.startswith('+++'):
+            current = None
+            continue
+        header = HUNK_HEADER_PATTERN.match(line)
+        if line.startswith('@@'):
+            current = (int(header.group(1)) if header else 0, [])
+            hunks.append(current)
+            continue
+        if current is None:
+            continue
+        if not line.strip():
+            continue
+        if line[0] in ' -+':
+            current[1].append((line[0], line[1:]))
+        elif not line.startswith('\\'):
+            # Hunk dışına çıkıldı (açıklama metni)
+            current = None
+    return [hunk for hunk in hunks if hunk[1]]
+
+def apply_unified_diff(original: str, diff_text: str) -> str:
+    """Unified diff'i metne uygular; satırlar boşluk farkları gözetilmeden eşleştirilir.
+
+    Satır numaraları yalnızca ipucudur: hunk'ın eski hali ipucuna en yakın konumda aranır.
+    Eşleşme bulunamazsa ValueError fırlatılır.
+    """
+    hunks = parse_unified_diff(diff_text)
+    if not hunks:
+        raise ValueError("Yanıtta uygulanabilir diff hunk'ı yok")
+
+    lines = original.splitlines()
+    original_count = len(lines)
+    search_from = 0
+    for hint, hunk_lines in hunks:
+        old_block = [text.strip() for sign, text in hunk_lines if sign != '+']
+        # Yalnızca ekleme yapan hunk'ta (@@ -N,0 +M,k @@) satırlar eski N. satırın ardına gelir;
+        # diğerlerinde N hunk'ın ilk eski satırıdır. Önceki hunk'ların eklediği/sildiği satırlar
+        # kadar ipucu kaydırılır.
+        hint_index = (hint if not old_block else max(0, hint - 1)) + len(lines) - original_count
+
+        if old_block:
+            candidates = [
+                index for index in range(search_from, len(lines) - len(old_block) + 1)
+                if all(lines[index + offset].strip() == expected for offset, expected in enumerate(old_block))
+            ]
+            if not candidates:
+                raise ValueError(f"Hunk eşleşmedi (satır {hint}): {old_block[0][:60]}")
+            start = min(candidates, key=lambda index: abs(index - hint_index))
+        else:
+            start = min(max(hint_index, search_from), len(lines))
+
+        # Bağlam satırları dosyadaki haliyle korunur; eklenen satırların girintisi, modelin
+        # bağlam satırlarında kaydırdığı kadar düzeltilir
+        indent_shift = 0
+        anchor = next((text for sign, text in hunk_lines if sign != '+'), None)
+        if anchor is not None:
+            file_line = lines[start]
+            indent_shift = (len(file_line) - len(file_line.lstrip())) - (len(anchor) - len(anchor.lstrip()))
+        replacement = []
+        position = start
+        for sign, text in hunk_lines:
+            if sign == '+':
+                if indent_shift > 0:
+                    text = " " * indent_shift + text
+                elif indent_shift < 0:
+                    text = text[min(-indent_shift, len(text) - len(text.lstrip())):]
+                replacement.append(text)
+                continue
+            if sign == ' ':
+                replacement.append(lines[position])
+            position += 1
+        lines[start:position] = replacement
+        search_from = start + len(replacement)
+
+    return "\n".join(lines)
+
+class CompilationUnitWatcher:
+    """Akış halindeki yanıtta C# derleme biriminin tamamlandığını izler.
+
+    Metin parça parça verilir; her parçada yalnızca yeni kısım taranır. Parça sınırında kalan
+    string ve yorumlar tamamlanana kadar beklenir. Derleme birimi yalnızca test metodu içeren
+    blok namespace'i kapandığında ya da test kodundan sonra üst düzeyde bir markdown kod çiti
+    geldiğinde tamam sayılır. Üst düzey sınıflar ve file-scoped namespace'lerde ardından başka
+    sınıflar gelebileceği için yanıtın sonu beklenir.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.position = 0
+        self.depth = 0
+        self.segment_start = 0
+        self.unit_open = False
+        self.file_scoped = False
+        self.complete = False
+
+    def _has_tests(self) -> bool:
+        return re.search(r'\[(?:Fact|Theory)\b', self.text[:self.position]) is not None
+
+    def feed(self, delta: str) -> bool:
+        """Yeni metni ekler; derleme birimi tamamlandıysa True döndürür."""
+        self.text += delta
+        text = self.text
+        while not self.complete and self.position < len(text):
+            skipped = skip_csharp_literal(text, self.position)
+            if skipped != self.position:
+                if skipped >= len(text):
+                    # Literal henüz bitmemiş olabilir; sonraki parçayı bekle
+                    break
+                self.position = skipped
+                continue
+            char = text[self.position]
+            if char == '`' and self.depth == 0:
+                # Kod çitinin tamamı gelmeden karar verilmez
+                if len(text) - self.position < 3:
+                    break
+                if text.startswith("```", self.position) and self._has_tests():
+                    self.complete = True
+                    break
+            elif char == '{':
+                if self.depth == 0:
+                    header = text[self.segment_start:self.position]
+                    self.unit_open = not self.file_scoped and re.search(r'\bnamespace\b', header) is not None
+                self.depth += 1
+            elif char == '}' and self.depth > 0:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.segment_start = self.position + 1
+                    # Test metodu içeren blok namespace'i kapandıysa kod tamamdır
+                    if self.unit_open and self._has_tests():
+                        self.complete = True
+            elif char == ';' and self.depth == 0:
+                if re.match(r'\s*namespace\b', text[self.segment_start:self.position]):
+                    self.file_scoped = True
+                self.segment_start = self.position + 1
+            self.position += 1
+        return self.complete
+
+# Önbelleğe alınmayan LLM çağrı türleri (düzeltmeler ve yama modundaki karşılıkları her seferinde güncel hataya göre istenir)
+UNCACHED_LLM_KINDS = ("fix", "build_fix", "fix_patch", "build_fix_patch")
+
+class LLMResponseCache:
+    """LLM yanıtlarını mesaj ve model ayarlarının hash'ine göre diskte saklar."""
+
+    DEFAULT_DIR = Path.home() / ".cache" / "csharp-test-generator" / "llm"
+
+    def __init__(self, cache_dir: Path = None, max_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir) if cache_dir else self.DEFAULT_DIR
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        # Toplam boyut bir kez hesaplanır, sonra put/evict ile güncellenir
+        self._size = sum(p.stat().st_size for p in self.cache_dir.glob("*/*.json"))
+
+    @staticmethod
+    def make_key(messages: list, settings: dict) -> str:
+        """Mesaj listesi ve model ayarlarından içerik adresli anahtar üretir."""
+        payload = {
+            "messages": [{"type": type(m).__name__, "content": str(m.content)} for m in messages],
+            "settings": settings
+        }
+        data = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def get(self, key: str):
+        """Önbellekteki yanıtı döndürür, yoksa None."""
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            # LRU için erişim zamanını güncelle
+            os.utime(path)
+            return entry.get("response")
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, response: str):
+        """Yanıtı önbelleğe yazar ve boyut sınırı aşılırsa eski kayıtları siler."""
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        data = json.dumps({"response": response, "created": time.time()}, ensure_ascii=False)
+        tmp_path = path.with_suffix(f".{uuid.uuid4().hex}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        with self._lock:
+            old_size = path.stat().st_size if path.exists() else 0
+            os.replace(tmp_path, path)
+            self._size += path.stat().st_size - old_size
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str):
+        """Kaydı önbellekten siler; yoksa bir şey yapmaz."""
+        path = self._path(key)
+        with self._lock:
+            try:
+                size = path.stat().st_size
+                path.unlink()
+                self._size -= size
+            except OSError:
+                pass
+
+    def _evict(self):
+        """En uzun süredir kullanılmayan kayıtları hedef boyuta inene kadar siler."""
+        entries = []
+        for entry_path in self.cache_dir.glob("*/*.json"):
+            try:
+                stat = entry_path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry_path))
+        entries.sort()
+
+        self._size = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, entry_path in entries:
+            if self._size <= target:
+                break
+            try:
+                entry_path.unlink()
+                self._size -= size
+            except OSError:
+                pass
+
+class TestManifest:
+    """Kaynak/test dosyası hash'lerini ve son test sonucunu test projesinin yanında saklar."""
+
+    FILE_NAME = ".testgen-manifest.json"
+
+    def __init__(self, tests_proj_dir: Path, root_dir: Path):
+        self.path = tests_proj_dir / self.FILE_NAME
+        self.root_dir = root_dir
+        self._lock = threading.Lock()
+        self.entries = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    self.entries = json.load(f).get("files", {})
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def file_hash(file_path: Path):
+        """Dosya içeriğinin SHA-256 hash'ini döndürür, dosya yoksa None."""
+        try:
+            with open(file_path, 'rb') as f:
+                return hashlib.sha256(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def _key(self, cs_file: Path) -> str:
+        return os.path.relpath(cs_file, self.root_dir).replace('\\', '/')
+
+    def is_green(self, cs_file: Path, test_file_path: Path) -> bool:
+        """Kaynak ve test dosyası değişmemiş ve son çalıştırma başarılıysa True döner."""
+        entry = self.entries.get(self._key(cs_file))
+        if not entry or not entry.get("passed"):
+            return False
+        return (entry.get("source_hash") == self.file_hash(cs_file)
+                and entry.get("test_hash") == self.file_hash(test_file_path))
+
+    def record(self, cs_file: Path, test_file_path: Path, passed: bool):
+        """Dosyanın son sonucunu kaydeder ve manifest'i diske yazar."""
+        with self._lock:
+            self.entries[self._key(cs_file)] = {
+                "source_hash": self.file_hash(cs_file),
+                "test_hash": self.file_hash(test_file_path),
+                "passed": passed,
+                "updated": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": 1, "files": self.entries}, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+def package_refs_xml(packages: list) -> str:
+    """(paket, sürüm) listesini PackageReference öğelerine çevirir."""
+    return "\n    ".join(f'<PackageReference Include="{name}" Version="{version}" />' for name, version in packages)
+
+def global_packages_folder() -> Path:
+    """NuGet'in genel paket klasörünü döndürür (NUGET_PACKAGES veya ~/.nuget/packages)."""
+    return Path(os.environ.get("NUGET_PACKAGES") or Path.home() / ".nuget" / "packages")
+
+class LocalPackageFeed:
+    """Tests.csproj'un sabitlenmiş paketlerini bağımlılıklarıyla birlikte tutan yerel klasör feed'i.
+
+    Feed bir kez `dotnet restore --packages` ile hazırlanır (NuGet'in hiyerarşik klasör düzeni,
+    doğrudan kaynak olarak kullanılabilir). Sonraki restore'lar ağ yerine bu klasörü ve genel
+    paket klasörünü kaynak alır.
+    """
+
+    MARKER_NAME = ".testgen-feed.json"
+
+    def __init__(self, feed_dir: Path, packages: list = None):
+        self.feed_dir = Path(feed_dir).expanduser().resolve()
+        self.packages = list(packages or PINNED_TEST_PACKAGES)
+
+    def _marker(self, target_framework: str) -> dict:
+        return {"target_framework": target_framework, "packages": [list(package) for package in self.packages]}
+
+    def is_ready(self, target_framework: str) -> bool:
+        """Feed bu paket sürümleri ve hedef framework için hazırlandıysa True döner."""
+        try:
+            with open(self.feed_dir / self.MARKER_NAME, 'r', encoding='utf-8') as f:
+                recorded = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if recorded != self._marker(target_framework):
+            return False
+        return all(
+            (self.feed_dir / name.lower() / version / f"{name.lower()}.{version}.nupkg").exists()
+            for name, version in self.packages
+        )
+
+    def prepare(self, target_framework: str, log_callback) -> bool:
+        """Paketleri feed klasörüne indirir; ağ (veya dolu bir NuGet önbelleği) yalnızca burada gerekir."""
+        prepare_dir = self.feed_dir / ".prepare"
+        prepare_dir.mkdir(parents=True, exist_ok=True)
+        prepare_csproj = prepare_dir / "FeedPrepare.csproj"
+        prepare_csproj.write_text(f"""<Project Sdk="Microsoft.NET.Sdk">
+  <PropertyGroup>
+    <TargetFramework>{target_framework}</TargetFramework>
+  </PropertyGroup>
+
+  <ItemGroup>
+    {package_refs_xml(self.packages)}
+  </ItemGroup>
+</Project>""", encoding='utf-8')
+
+        log_callback(f"\nYerel paket feed'i hazırlanıyor: {self.feed_dir}", "info")
+        result = run_streaming(
+            ["dotnet", "restore", str(prepare_csproj), "--packages", str(self.feed_dir)],
+            log_path=self.feed_dir / "prepare.log"
+        )
+        shutil.rmtree(prepare_dir, ignore_errors=True)
+        if result.returncode != 0:
+            log_callback(f"Paket feed'i hazırlanamadı, tam çıktı: {result.log_path}", "warning")
+            if result.error_lines:
+                log_callback("\n".join(result.error_lines), "error")
+            return False
+
+        with open(self.feed_dir / self.MARKER_NAME, 'w', encoding='utf-8') as f:
+            json.dump(self._marker(target_framework), f, indent=2)
+        if not self.is_ready(target_framework):
+            log_callback(f"Paket feed'inde sabitlenmiş paketler eksik: {self.feed_dir}", "warning")
+            return False
+        log_callback("Yerel paket feed'i hazır.", "success")
+        return True
+
+    def restore_arguments(self) -> list:
+        """Restore'u ağ yerine yerel feed'e ve genel paket klasörüne yönlendiren argümanlar."""
+        return ["--source", str(self.feed_dir), "--source", str(global_packages_folder())]
+
+class RestoreFingerprint:
+    """Restore'u etkileyen proje dosyalarının parmak izini son başarılı restore ile karşılaştırır.
+
+    Parmak izi solution, .csproj dosyaları (üretilen Tests.csproj dahil), merkezi paket ve
+    build ayar dosyaları, NuGet.config ve global.json içeriklerinden hesaplanır. restored_projects
+    verilirse yalnızca restore edilen bu projeler hesaba katılır ve parmak izi ayrı bir dosyada
+    ("tests" kapsamı) tutulur; böylece solution geneli ve budanmış restore'lar birbirinin kaydını
+    geçersiz kılmaz. Parmak izi değişmediyse ve her projenin project.assets.json dosyası
+    yerindeyse restore atlanabilir.
+    """
+
+    FILE_NAME = ".testgen-restore.{scope}.json"
+    PROJECT_FILE_NAMES = {
+        "directory.packages.props",
+        "directory.build.props",
+        "directory.build.targets",
+        "nuget.config",
+        "global.json",
+        "packages.lock.json"
+    }
+    PROJECT_FILE_SUFFIXES = (".csproj", ".sln")
+    # Build çıktıları ve kopya test projeleri parmak izine girmez
+    IGNORED_DIRS = {"bin", "obj", ".git", ".vs", "node_modules", "TestResults", "Tests.pending", "logs"}
+
+    def __init__(self, tests_proj_dir: Path, root_dir: Path, restored_projects: List[Path] = None):
+        scope = "solution" if restored_projects is None else "tests"
+        self.path = tests_proj_dir / self.FILE_NAME.format(scope=scope)
+        self.root_dir = root_dir
+        self.restored_projects = None
+        if restored_projects is not None:
+            self.restored_projects = {os.path.normcase(os.path.normpath(str(project))) for project in restored_projects}
+        self.projects = []
+        self.fingerprint = self._compute()
+
+    def _project_files(self) -> List[Path]:
+        files = []
+        for directory, dir_names, file_names in os.walk(self.root_dir):
+            dir_names[:] = [
+                name for name in dir_names
+                if name not in self.IGNORED_DIRS and not name.startswith("Tests_scratch")
+            ]
+            for name in file_names:
+                if name.lower() in self.PROJECT_FILE_NAMES or name.endswith(self.PROJECT_FILE_SUFFIXES):
+                    files.append(Path(directory) / name)
+        return sorted(files)
+
+    def _compute(self) -> str:
+        digest = hashlib.sha256()
+        self.projects = []
+        for project_file in self._project_files():
+            if project_file.suffix == ".csproj":
+                # Restore edilmeyen projelerin ne içeriği ne de assets dosyası önemlidir
+                if self.restored_projects is not None and \
+                        os.path.normcase(os.path.normpath(str(project_file))) not in self.restored_projects:
+                    continue
+                self.projects.append(project_file)
+            relative = os.path.relpath(project_file, self.root_dir).replace('\\', '/')
+            digest.update(f"{relative}\0{TestManifest.file_hash(project_file)}\n".encode("utf-8"))
+        return digest.hexdigest()
+
+    def missing_assets(self) -> List[Path]:
+        """obj/project.assets.json dosyası olmayan projeleri döndürür."""
+        return [project for project in self.projects if not (project.parent / "obj" / "project.assets.json").exists()]
+
+    def is_current(self) -> bool:
+        """Son başarılı restore'dan beri proje grafiği değişmediyse True döner."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                recorded = json.load(f).get("fingerprint")
+        except (OSError, ValueError):
+            return False
+        return recorded == self.fingerprint and not self.missing_assets()
+
+    def record(self):
+        """Başarılı restore'un parmak izini kaydeder."""
+        # Restore'un kendisi packages.lock.json yazmış olabilir
+        self.fingerprint = self._compute()
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({
+                "version": 1,
+                "fingerprint": self.fingerprint,
+                "projects": len(self.projects),
+                "updated": time.strftime("%Y-%m-%dT%H:%M:%S")
+            }, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+class SymbolIndex:
+    """Solution'daki tüm tiplerin imzalarını test projesinin yanında saklayan kalıcı dizin.
+
+    Dosyalar mtime/boyut değişmedikçe yeniden okunmaz; değişenlerin içeriği hash ile
+    karşılaştırılır ve yalnızca gerçekten değişen dosyalar yeniden parse edilir. Tip adına
+    göre arama sözlükle yapılır.
+    """
+
+    FILE_NAME = ".testgen-symbols.json"
+    VERSION = 1
+
+    def __init__(self, tests_proj_dir: Path, root_dir: Path):
+        self.path = tests_proj_dir / self.FILE_NAME
+        self.root_dir = root_dir
+        self.files = {}
+        self._by_name = {}
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get("version") == self.VERSION:
+                    self.files = data.get("files", {})
+            except (OSError, ValueError):
+                self.files = {}
+        self._rebuild_lookup()
+
+    def _key(self, cs_file: Path) -> str:
+        return os.path.relpath(cs_file, self.root_dir).replace('\\', '/')
+
+    def _rebuild_lookup(self):
+        self._by_name = {}
+        for entry in self.files.values():
+            for symbol in entry["types"]:
+                self._by_name.setdefault(symbol["name"], []).append(symbol)
+                self._by_name.setdefault(symbol["full_name"], []).append(symbol)
+
+    def update(self, cs_files: List[Path]) -> dict:
+        """Dizini verilen dosyalarla eşitler; (parsed, unchanged, removed) sayılarını döndürür."""
+        counts = {"parsed": 0, "unchanged": 0, "removed": 0}
+        current = {}
+        for cs_file in cs_files:
+            key = self._key(cs_file)
+            try:
+                stat = cs_file.stat()
+            except OSError:
+                continue
+            entry = self.files.get(key)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                current[key] = entry
+                counts["unchanged"] += 1
+                continue
+
+            try:
+                content = cs_file.read_bytes()
+            except OSError:
+                continue
+            content_hash = hashlib.sha256(content).hexdigest()
+            if entry and entry["hash"] == content_hash:
+                # Yalnızca zaman damgası değişmiş (checkout, kopyalama)
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                current[key] = entry
+                counts["unchanged"] += 1
+                continue
+
+            outline = parse_csharp_outline(content.decode('utf-8', errors='replace'))
+            current[key] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "hash": content_hash,
+                "types": [
+                    {
+                        "name": declared.name,
+                        "full_name": declared.full_name,
+                        "kind": declared.kind,
+                        "file": key,
+                        "signature": render_type_signature(declared)
+                    }
+                    for declared in outline.types
+                ]
+            }
+            counts["parsed"] += 1
+
+        counts["removed"] = len(set(self.files) - set(current))
+        changed = counts["parsed"] or counts["removed"] or any(
+            self.files.get(key) is not entry for key, entry in current.items()
+        )
+        self.files = current
+        self._rebuild_lookup()
+        if changed:
+            self.save()
+        return counts
+
+    def save(self):
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": self.VERSION, "files": self.files}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, type_name: str) -> List[dict]:
+        """Tip adına (kısa veya tam ad; generic/nullable ekleri yok sayılır) göre kayıtları döndürür."""
+        name = re.sub(r'<.*|\?$|\[\]$', '', type_name.strip())
+        symbols = self._by_name.get(name)
+        if symbols is None and '.' in name:
+            symbols = self._by_name.get(name.rsplit('.', 1)[-1])
+        return symbols or []
 
 class CSharpTestGenerator:
-    def __init__(self, api_key=None):
+    def __init__(
+        self,
+        api_key=None,
+        model: str = "mistral-large-latest",
+        max_attempts: int = 5,
+        max_workers: int = 1,
+        cache_mode: str = "use",
+        cache_dir: Path = None,
+        cache_max_mb: int = 256,
+        skip_unchanged: bool = True,
+        targeted_build: bool = True,
+        filter_tests: bool = True,
+        collect_coverage: bool = False,
+        build_error_limit: int = None,
+        solution_file: Path = None,
+        shard_index: int = 0,
+        shard_count: int = 1,
+        provider: str = "mistral",
+        ollama_url: str = "http://localhost:11434",
+        llm_concurrency: int = 4,
+        prefetch_generation: bool = True,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        llm_max_retries: int = 5,
+        stream_responses: bool = True,
+        patch_mode: bool = True,
+        candidates: int = 1,
+        context_token_budget: int = 3000,
+        isolated_builds: bool = True,
+        keep_build_servers: bool = True,
+        skip_unchanged_restore: bool = True,
+        package_feed: Path = None,
+        prune_references: bool = True
+    ):
         # Mistral modelini yapılandır
-        self.llm = ChatMistralAI(
-            api_key=api_key,
-            model="mistral-large-latest",
-            temperature=0.7,
-            max_tokens=4096,
-            top_p=0.95
+        self.llm_settings = {
+            "provider": provider,
+            "model": model,
+            "temperature": 0.7,
+            "max_tokens": 4096,
+            "top_p": 0.95
+        }
+        if provider == "mistral":
+            self.llm = ChatMistralAI(
+                api_key=api_key,
+                model=model,
+                temperature=self.llm_settings["temperature"],
+                max_tokens=self.llm_settings["max_tokens"],
+                top_p=self.llm_settings["top_p"]
+            )
+        elif provider == "ollama":
+            self.llm = AsyncOllamaAPI(
+                ollama_url,
+                model=model,
+                temperature=self.llm_settings["temperature"],
+                top_p=self.llm_settings["top_p"],
+                max_tokens=self.llm_settings["max_tokens"],
+                max_connections=llm_concurrency
+            )
+        else:
+            raise ValueError(f"Geçersiz LLM sağlayıcısı: {provider}")
+
+        # Tüm LLM çağrıları havuzlanmış async istemci üzerinden, sınırlı eşzamanlılıkla yapılır
+        self.llm_client = AsyncLLMClient(
+            self.llm,
+            max_in_flight=llm_concurrency,
+            rate_limiter=AdaptiveRateLimiter(requests_per_minute, tokens_per_minute),
+            max_retries=llm_max_retries,
+            log_callback=self._log
         )
+        # Yanıtlar akış halinde alınır; üretilen kod tamamlanınca erken kesilir
+        self.stream_responses = stream_responses
+        # Düzeltmelerde tüm dosya yerine unified diff istenir
+        self.patch_mode = patch_mode
+
+        # Spekülatif üretim: ilk denemede K aday paralel üretilir, ayrı kopya projelerde denenir
+        self.candidates = max(1, int(candidates))
+        self._scratch_lock = threading.Lock()
+        self._scratch_free = []
+        self._scratch_count = 0
+        # İlk test üretimleri önceden başlatılır; build beklenirken yanıtlar hazırlanır
+        self.prefetch_generation = prefetch_generation
+        self._prefetched = {}
+        self._prefetch_lock = threading.Lock()
+
+        # LLM yanıt önbelleği: "use" okur/yazar, "refresh" yalnızca yazar, "off" kapalı
+        if cache_mode not in ("use", "refresh", "off"):
+            raise ValueError(f"Geçersiz önbellek modu: {cache_mode}")
+        self.cache_mode = cache_mode
+        self.llm_cache = LLMResponseCache(cache_dir, cache_max_mb * 1024 * 1024) if cache_mode != "off" else None
         
         # Test Generator için sistem mesajı
         self.test_generator_system = SystemMessage(
@@ -264,8 +2377,81 @@ class CSharpTestGenerator:
             "Explain expected vs actual behavior for failures."
         )
 
-    def run_llm(self, prompt: str, is_analyzer: bool = False) -> str:
-        """LLM'i çalıştırır ve yanıt alır."""
+        # Prompt'a tüm kaynak yerine ilgili üyeler bu token bütçesiyle eklenir (None: tüm kaynak)
+        self.context_token_budget = context_token_budget
+        # Solution genelindeki tip imzaları; generate_and_run_tests içinde yüklenir
+        self.symbol_index = None
+
+        # Değişmemiş ve başarılı testleri yeniden üretme
+        self.skip_unchanged = skip_unchanged
+        # Proje dosyaları son başarılı restore'dan beri değişmediyse restore atlanır
+        self.skip_unchanged_restore = skip_unchanged_restore
+        # Verilirse test paketleri ağ yerine bu yerel klasör feed'inden restore edilir
+        self.package_feed = LocalPackageFeed(package_feed) if package_feed else None
+        self._restore_arguments = []
+
+        # Hedefli build: ilk tam build'den sonra yalnızca Tests.csproj derlenir
+        self.targeted_build = targeted_build
+        # Tests.csproj yalnızca test edilen projeleri (ve referanslarını) referanslar; build
+        # solution yerine test projesinden başlar
+        self.prune_references = prune_references
+        self._dependencies_built = False
+
+        # Dosya bazında yalnızca üretilen test sınıfını çalıştır, tüm paketi sonda bir kez
+        self.filter_tests = filter_tests
+        self.full_suite_result = None
+
+        # Kapsam (coverage) ölçümü düzeltme döngüsünde değil, sonda tek seferlik çalışır
+        self.collect_coverage = collect_coverage
+
+        # Bu kadar build hatası görülünce build erken durdurulur (None: sınırsız)
+        self.build_error_limit = build_error_limit
+
+        # Paralel çalışma ayarları: 1 ise dosyalar sırayla işlenir
+        self.max_workers = max(1, int(max_workers))
+        # Aynı anda yalnızca bir dotnet build/test çalışabilir (ortak test projesi)
+        self._build_lock = threading.Lock()
+        # Paralel modda her işçi kendi kopya test projesinde derler; geçen testler ana projeye taşınır
+        self.isolated_builds = isolated_builds
+        # Build'ler çalıştırma boyunca sıcak tutulan MSBuild/derleyici sunucularıyla yapılır
+        self.build_executor = BuildExecutor(keep_warm=keep_build_servers)
+
+        # Dosya başına deneme sayısı ve açıkça seçilen solution
+        self.max_attempts = max_attempts
+        self.solution_file = Path(solution_file) if solution_file else None
+
+        # Parça (shard) ayarları: dosyalar birden çok makineye bölünebilir
+        if shard_count < 1 or not 0 <= shard_index < shard_count:
+            raise ValueError(f"Geçersiz shard ayarı: {shard_index}/{shard_count}")
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
+        # Rapor için dosya bazında istatistikler; LLM kullanımı thread'in işlediği dosyaya yazılır
+        self.file_stats = {}
+        self._stats_lock = threading.Lock()
+        self._local = threading.local()
+        # Çalıştırma boyunca yapılan tüm LLM çağrılarının ölçümleri
+        self.llm_calls = []
+        # Dosya başına kullanılan önbellek anahtarları
+        self._file_cache_keys = {}
+        # Log callback'i olmayan yardımcı çağrılar (LLM hataları, tekrar denemeleri) bunu kullanır;
+        # işçi thread'lerinde o dosyanın log'u tercih edilir
+        self._log_callback = None
+
+    def _log(self, message: str, level: str = "info"):
+        """Mesajı işlenen dosyanın, yoksa çalıştırmanın log callback'ine yazar."""
+        log_callback = getattr(self._local, "log_callback", None) or self._log_callback
+        if log_callback:
+            log_callback(message, level)
+
+    def run_llm(self, prompt: str, is_analyzer: bool = False, kind: str = None, attempt: int = None, on_text=None, stop_at_compilation_unit: bool = None, llm_kwargs: dict = None, cancel_event: threading.Event = None) -> str:
+        """LLM'i çalıştırır ve yanıt alır; çağrının token ve süre ölçümlerini kaydeder.
+
+        Akış açıksa yanıt parçaları geldikçe on_text'e iletilir; test kodu üretiminde
+        (stop_at_compilation_unit) namespace/sınıf blokları kapanınca üretim durdurulur.
+        llm_kwargs (ör. temperature, seed) bu çağrı için model ayarlarını geçersiz kılar.
+        cancel_event set edilirse istek iptal edilir ve boş metin döner.
+        """
         try:
             # Sistem mesajını seç
             system_message = self.analyzer_system if is_analyzer else self.test_generator_system
@@ -276,11 +2462,67 @@ class CSharpTestGenerator:
                 HumanMessage(content=prompt)
             ]
             
-            # LLM'den yanıt al
-            response = self.llm.invoke(messages)
+            # Önbellekte aynı istek varsa ağa gitmeden yanıtı kullan. Düzeltme prompt'ları
+            # önbelleğe alınmaz: aynı hatalı kod için aynı (başarısız) düzeltme tekrar oynatılmasın
+            llm_kwargs = llm_kwargs or {}
+            cache_key = LLMResponseCache.make_key(messages, {**self.llm_settings, **llm_kwargs})
+            use_cache = self.llm_cache is not None and kind not in UNCACHED_LLM_KINDS
+            content = None
+            if use_cache and self.cache_mode == "use":
+                content = self.llm_cache.get(cache_key)
+            
+            # Aynı istek önceden başlatıldıysa onun sonucunu bekle
+            with self._prefetch_lock:
+                prefetched = self._prefetched.pop(cache_key, None)
+            
+            stats = getattr(self._local, "stats", None)
+            metrics = LLMCallMetrics(
+                kind=kind or ("analyze" if is_analyzer else "generate"),
+                model=self.llm_settings["model"],
+                attempt=attempt,
+                file=stats["source"] if stats is not None else None
+            )
+            if content is None:
+                # LLM'den yanıt al; önceden başlatılan istekte süre gönderimden itibaren ölçülür
+                if prefetched is not None:
+                    future, started = prefetched
+                    response = self.llm_client.result(future, cancel_event)
+                    metrics.prefetched = True
+                elif self.stream_responses:
+                    started = time.time()
+                    if stop_at_compilation_unit is None:
+                        stop_at_compilation_unit = not is_analyzer
+                    watcher = CompilationUnitWatcher() if stop_at_compilation_unit else None
+                    should_stop = None
+                    if watcher or cancel_event:
+                        should_stop = lambda text: bool(cancel_event and cancel_event.is_set()) or bool(watcher and watcher.feed(text))
+                    response = self.llm_client.stream(messages, on_text=on_text, should_stop=should_stop, cancel_event=cancel_event, **llm_kwargs)
+                else:
+                    started = time.time()
+                    response = self.llm_client.invoke(messages, cancel_event=cancel_event, **llm_kwargs)
+                if cancel_event is not None and cancel_event.is_set():
+                    # Yarıda kesilen yanıt önbelleğe yazılmaz
+                    return ""
+                metrics.latency = round(time.time() - started, 3)
+                # Akış yoksa yanıt tek parça geldiği için ilk token süresi toplam süreye eşittir
+                metrics.time_to_first_token = (response.response_metadata or {}).get("time_to_first_token", metrics.latency)
+                content = str(response.content)
+                if on_text and (prefetched is not None or not self.stream_responses):
+                    on_text(content)
+                if use_cache and content.strip():
+                    self.llm_cache.put(cache_key, content)
+                self._fill_token_usage(metrics, response, messages, content)
+            else:
+                metrics.cached = True
+                if on_text:
+                    on_text(content)
+            self._record_llm_call(metrics)
+            # Dosya başarısız biterse ilk üretim yanıtları önbellekten silinir (process_file)
+            if use_cache and stats is not None:
+                with self._stats_lock:
+                    self._file_cache_keys.setdefault(stats["source"], []).append(cache_key)
             
             # Backtick karakterlerini temizle ve kodu düzelt
-            content = str(response.content)
             content = re.sub(r'^```csharp\s*', '', content)  # Başlangıç kod bloğunu temizle
             content = re.sub(r'\s*```$', '', content)        # Bitiş kod bloğunu temizle
             content = re.sub(r'```\s*$', '', content)        # Alternatif bitiş bloğunu temizle
@@ -289,12 +2531,121 @@ class CSharpTestGenerator:
             
             return content
             
+        except CancelledError:
+            return ""
         except Exception as e:
-            print(f"LLM hatası: {str(e)}")
+            self._log(f"LLM hatası: {str(e)}", "error")
             return ""
 
+    def run_llm_batch(self, prompts: List[str], is_analyzer: bool = False, kind: str = None) -> List[str]:
+        """Birden çok prompt'u aynı anda LLM'e gönderir; başarısız olanlar için boş metin döner."""
+        system_message = self.analyzer_system if is_analyzer else self.test_generator_system
+        kind = kind or ("analyze" if is_analyzer else "generate")
+        message_lists = [[system_message, HumanMessage(content=prompt)] for prompt in prompts]
+        cache_keys = [LLMResponseCache.make_key(messages, self.llm_settings) for messages in message_lists]
+
+        # Önbellekte olanları ayır, yalnızca eksikleri gönder
+        contents = [None] * len(prompts)
+        if self.llm_cache and self.cache_mode == "use":
+            contents = [self.llm_cache.get(key) for key in cache_keys]
+        missing = [i for i, content in enumerate(contents) if content is None]
+
+        for i, content in enumerate(contents):
+            if content is not None:
+                self._record_llm_call(LLMCallMetrics(kind=kind, model=self.llm_settings["model"], cached=True))
+
+        # İstekler birlikte gönderildiği için her birinin süresi toplu bekleme süresidir
+        started = time.time()
+        responses = self.llm_client.gather([message_lists[i] for i in missing]) if missing else []
+        latency = round(time.time() - started, 3)
+        for i, response in zip(missing, responses):
+            if isinstance(response, Exception):
+                self._log(f"LLM hatası: {str(response)}", "error")
+                contents[i] = ""
+                continue
+            contents[i] = str(response.content)
+            if self.llm_cache and contents[i].strip():
+                self.llm_cache.put(cache_keys[i], contents[i])
+            metrics = LLMCallMetrics(kind=kind, model=self.llm_settings["model"], latency=latency, time_to_first_token=latency)
+            self._fill_token_usage(metrics, response, message_lists[i], contents[i])
+            self._record_llm_call(metrics)
+        return contents
+
+    def prefetch_initial_tests(self, cs_files: List[Path], log_callback):
+        """Dosyaların ilk üretim prompt'larını arka planda LLM'e gönderir; run_llm sonucu buradan alır."""
+        submitted = 0
+        for cs_file in cs_files:
+            try:
+                with open(cs_file, 'r', encoding='utf-8') as f:
+                    source_code = f.read()
+            except OSError:
+                continue
+            code_analysis = self.analyze_source_code(source_code)
+            project_name = cs_file.parent.name or "Project"
+            prompt = self.build_generation_prompt(source_code, code_analysis, project_name, [])
+            messages = [self.test_generator_system, HumanMessage(content=prompt)]
+            cache_key = LLMResponseCache.make_key(messages, self.llm_settings)
+
+            # Önbellekte olan veya zaten başlatılmış istekleri tekrar gönderme
+            if self.llm_cache and self.cache_mode == "use" and self.llm_cache.get(cache_key) is not None:
+                continue
+            with self._prefetch_lock:
+                if cache_key in self._prefetched:
+                    continue
+                if self.stream_responses:
+                    request = self.llm_client.astream(messages, should_stop=CompilationUnitWatcher().feed)
+                else:
+                    request = self.llm_client.ainvoke(messages)
+                self._prefetched[cache_key] = (self.llm_client.submit(request), time.time())
+            submitted += 1
+
+        if submitted:
+            log_callback(f"{submitted} dosya için test üretimi arka planda başlatıldı (en fazla {self.llm_client.max_in_flight} eşzamanlı istek).", "info")
+
+    def close(self):
+        """Bekleyen önceden başlatılmış istekleri iptal eder ve LLM istemcisini kapatır."""
+        with self._prefetch_lock:
+            for future, _ in self._prefetched.values():
+                future.cancel()
+            self._prefetched.clear()
+        self.llm_client.close()
+
+    @staticmethod
+    def _fill_token_usage(metrics: LLMCallMetrics, response, messages: list, content: str):
+        """Yanıttaki token sayılarını ölçüme yazar; sağlayıcı bildirmediyse metinden tahmin eder."""
+        prompt_tokens, completion_tokens = response_token_usage(response)
+        if not prompt_tokens and not completion_tokens:
+            prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+            completion_tokens = estimate_tokens(content)
+            metrics.estimated = True
+        metrics.prompt_tokens = prompt_tokens
+        metrics.completion_tokens = completion_tokens
+
+    def _record_llm_call(self, metrics: LLMCallMetrics):
+        """Çağrı ölçümünü çalıştırma listesine ve işlenen dosyanın istatistiklerine ekler."""
+        stats = getattr(self._local, "stats", None)
+        # Spekülatif adaylar aynı dosya istatistiğine farklı thread'lerden yazar
+        with self._stats_lock:
+            self.llm_calls.append(metrics)
+            if stats is None:
+                return
+            stats["llm_call_details"].append(asdict(metrics))
+            if metrics.cached:
+                stats["cached_responses"] += 1
+                return
+            stats["llm_calls"] += 1
+            stats["prompt_tokens"] += metrics.prompt_tokens
+            stats["completion_tokens"] += metrics.completion_tokens
+            stats["llm_latency"] = round(stats["llm_latency"] + metrics.latency, 3)
+
     def find_solution_file(self, start_path: Path) -> Path:
         """Verilen dizinden başlayarak üst dizinlerde .sln dosyalarını arar."""
+        # Solution açıkça verildiyse aramaya gerek yok
+        if self.solution_file:
+            if not self.solution_file.exists():
+                raise FileNotFoundError(f"Solution dosyası bulunamadı: {self.solution_file}")
+            return self.solution_file
+        
         solutions = []
         current_path = start_path
         
@@ -337,6 +2688,75 @@ class CSharpTestGenerator:
                 csproj_files.append(file_path)
         return csproj_files
 
+    @staticmethod
+    def read_project_references(csproj_file: Path) -> List[Path]:
+        """csproj içindeki ProjectReference yollarını mutlak yol olarak döndürür."""
+        try:
+            root = ET.parse(csproj_file).getroot()
+        except (OSError, ET.ParseError):
+            return []
+        references = []
+        for element in root.iter():
+            # Eski stil projelerde öğeler MSBuild namespace'i ile gelir
+            if element.tag.rsplit('}', 1)[-1] == "ProjectReference" and element.get("Include"):
+                include = element.get("Include").replace('\\', '/')
+                references.append(Path(os.path.normpath(csproj_file.parent / include)))
+        return references
+
+    def select_project_references(self, cs_files: List[Path], csproj_files: List[Path], log_callback) -> List[Path]:
+        """Test edilen dosyaların ait olduğu projeleri ve bunların geçişli referanslarını döndürür.
+
+        Her dosya, dizin ağacında kendisine en yakın .csproj'a aittir. Sahibi bulunamayan dosya
+        varsa tüm projeler döner.
+        """
+        project_dirs = sorted(((csproj.parent, csproj) for csproj in csproj_files), key=lambda item: len(item[0].parts), reverse=True)
+        owners = set()
+        for cs_file in cs_files:
+            owner = next((csproj for directory, csproj in project_dirs if directory in cs_file.parents), None)
+            if owner is None:
+                log_callback(f"{cs_file.name} için proje bulunamadı, tüm projeler referanslanacak.", "warning")
+                return list(csproj_files)
+            owners.add(owner)
+
+        return self.project_closure(sorted(owners))
+
+    def project_closure(self, roots: List[Path]) -> List[Path]:
+        """Verilen projeleri ve ProjectReference ile geçişli olarak referansladıkları projeleri döndürür."""
+        selected = []
+        pending = list(roots)
+        seen = set()
+        while pending:
+            csproj = pending.pop()
+            key = os.path.normcase(str(csproj))
+            if key in seen:
+                continue
+            seen.add(key)
+            selected.append(csproj)
+            pending.extend(reference for reference in self.read_project_references(csproj) if reference.exists())
+        return sorted(selected)
+
+    def add_missing_project_references(self, csproj_path: Path, cs_files: List[Path], solution_dir: Path, log_callback):
+        """Mevcut Tests.csproj'a bu çalıştırmada test edilen dosyaların eksik proje referanslarını ekler."""
+        existing = {os.path.normcase(str(reference)) for reference in self.read_project_references(csproj_path)}
+        needed = self.select_project_references(cs_files, self.find_csproj_files(solution_dir), log_callback)
+        missing = [csproj for csproj in needed if os.path.normcase(str(csproj)) not in existing]
+        if not missing:
+            return
+
+        content = csproj_path.read_text(encoding='utf-8')
+        new_refs = "".join(
+            f'\n    <ProjectReference Include="{os.path.relpath(csproj, csproj_path.parent).replace(chr(92), "/")}" />'
+            for csproj in missing
+        )
+        last_reference = list(re.finditer(r'<ProjectReference\b[^>]*?(?:/>|>.*?</ProjectReference>)', content, re.DOTALL))
+        if last_reference:
+            position = last_reference[-1].end()
+            content = content[:position] + new_refs + content[position:]
+        else:
+            content = content.replace("</Project>", f"  <ItemGroup>{new_refs}\n  </ItemGroup>\n</Project>", 1)
+        csproj_path.write_text(content, encoding='utf-8')
+        log_callback(f"Test projesine {len(missing)} proje referansı eklendi: {[csproj.name for csproj in missing]}", "info")
+
     def add_project_to_solution(self, solution_path: Path, project_path: Path, log_callback) -> bool:
         """Test projesini solution dosyasına ekler."""
         try:
@@ -397,7 +2817,41 @@ EndProject'''
             log_callback(f"Proje solution'a eklenirken hata oluştu: {str(e)}", "error")
             return False
 
-    def run_tests(self, test_project_path: Path, solution_path: Path, log_callback) -> dict:
+    def _prepare_package_feed(self, tests_proj_dir: Path, log_callback):
+        """Yerel feed modunda feed'i gerekirse hazırlar ve restore argümanlarını ayarlar."""
+        self._restore_arguments = []
+        if self.package_feed is None:
+            return
+        csproj_path = tests_proj_dir / "Tests.csproj"
+        try:
+            framework_match = re.search(r'<TargetFramework>(.*?)</TargetFramework>', csproj_path.read_text(encoding='utf-8'))
+        except OSError:
+            framework_match = None
+        target_framework = framework_match.group(1) if framework_match else "net6.0"
+        if self.package_feed.is_ready(target_framework) or self.package_feed.prepare(target_framework, log_callback):
+            self._restore_arguments = self.package_feed.restore_arguments()
+            log_callback(f"Restore yerel paket feed'ini kullanacak: {self.package_feed.feed_dir}", "info")
+        else:
+            log_callback("Restore yapılandırılmış NuGet kaynaklarını kullanacak.", "warning")
+
+    def _restore_fingerprint(self, tests_proj_dir: Path, solution_dir: Path, log_callback, whole_solution: bool = False):
+        """Restore gerekiyorsa parmak izini, proje grafiği değişmediyse None döndürür."""
+        started = time.perf_counter()
+        # Referanslar budanmışsa yalnızca Tests.csproj ve referans kapanışı restore edilir
+        restored_projects = None
+        if self.prune_references and not whole_solution:
+            restored_projects = self.project_closure([tests_proj_dir / "Tests.csproj"])
+        fingerprint = RestoreFingerprint(tests_proj_dir, solution_dir, restored_projects)
+        if self.skip_unchanged_restore and fingerprint.is_current():
+            log_callback(
+                f"Proje dosyaları son restore'dan beri değişmedi, restore atlandı "
+                f"({len(fingerprint.projects)} proje, {time.perf_counter() - started:.2f}s).",
+                "info"
+            )
+            return None
+        return fingerprint
+
+    def run_tests(self, test_project_path: Path, solution_path: Path, log_callback, test_filter: str = None) -> dict:
         """Testleri çalıştırır ve sonuçları döndürür."""
         results = {}
         original_cwd = os.getcwd()
@@ -416,67 +2870,48 @@ EndProject'''
             log_callback(f"Kullanılan solution: {solution_path}")
             log_callback(f"Test proje yolu: {test_project_path}")
             
-            # Önce test projesini restore et
-            log_callback("\nTest projesi restore ediliyor...")
-            test_restore_result = subprocess.run(
-                ["dotnet", "restore", str(test_project_path), "--verbosity", "detailed"],
-                capture_output=True,
-                text=True
-            )
-            
-            if test_restore_result.stdout:
-                log_callback("\nTest projesi restore çıktısı:", "info")
-                log_callback(test_restore_result.stdout, "info")
-            
-            if test_restore_result.stderr:
-                log_callback("\nTest projesi restore hata çıktısı:", "error")
-                log_callback(test_restore_result.stderr, "error")
-            
-            # Sonra solution'ı restore et
-            log_callback("\nSolution restore ediliyor...")
-            restore_result = subprocess.run(
-                ["dotnet", "restore", str(solution_path), "--verbosity", "detailed"],
-                capture_output=True,
-                text=True
-            )
-            
-            if restore_result.stdout:
-                log_callback("\nSolution restore çıktısı:", "info")
-                log_callback(restore_result.stdout, "info")
-            
-            if restore_result.stderr:
-                log_callback("\nSolution restore hata çıktısı:", "error")
-                log_callback(restore_result.stderr, "error")
-            
-            if restore_result.returncode != 0:
-                log_callback(f"\nRestore işlemi başarısız oldu. Hata kodu: {restore_result.returncode}", "error")
-                # Proje referans yolunu kontrol et
-                csproj_path = test_project_path / f"{test_project_path.name}.csproj"
-                if csproj_path.exists():
-                    with open(csproj_path, 'r', encoding='utf-8') as f:
-                        csproj_content = f.read()
-                        log_callback(f"\nTest proje dosyası içeriği:", "info")
-                        log_callback(csproj_content, "info")
-                return results
-            else:
+            # Proje grafiği değişmediyse restore'ları atla
+            self._prepare_package_feed(test_project_path, log_callback)
+            restore_fingerprint = self._restore_fingerprint(test_project_path, solution_dir, log_callback, whole_solution=True)
+            if restore_fingerprint is not None:
+                # Önce test projesini restore et
+                log_callback("\nTest projesi restore ediliyor...")
+                test_restore_result = run_streaming(
+                    ["dotnet", "restore", str(test_project_path), "--verbosity", "detailed"] + self._restore_arguments,
+                    log_path=self._log_path(test_project_path, "restore-tests")
+                )
+                self._log_process_output(test_restore_result, "Test projesi restore", log_callback)
+                
+                # Sonra solution'ı restore et
+                log_callback("\nSolution restore ediliyor...")
+                restore_result = run_streaming(
+                    ["dotnet", "restore", str(solution_path), "--verbosity", "detailed"] + self._restore_arguments,
+                    log_path=self._log_path(test_project_path, "restore-solution")
+                )
+                self._log_process_output(restore_result, "Solution restore", log_callback)
+                
+                if restore_result.returncode != 0:
+                    log_callback(f"\nRestore işlemi başarısız oldu. Hata kodu: {restore_result.returncode}", "error")
+                    # Proje referans yolunu kontrol et
+                    csproj_path = test_project_path / f"{test_project_path.name}.csproj"
+                    if csproj_path.exists():
+                        with open(csproj_path, 'r', encoding='utf-8') as f:
+                            csproj_content = f.read()
+                            log_callback(f"\nTest proje dosyası içeriği:", "info")
+                            log_callback(csproj_content, "info")
+                    return results
+                elif test_restore_result.returncode == 0:
+                    restore_fingerprint.record()
                 log_callback("\nRestore işlemi başarılı!", "success")
             
             # Build işlemi için de solution dosyasını belirt
             log_callback("\nProje derleniyor...")
-            build_result = subprocess.run(
+            build_result = self.build_executor.run(
                 ["dotnet", "build", str(solution_path), "--no-restore", "-v:d"],
-                capture_output=True,
-                text=True
+                log_path=self._log_path(test_project_path, "build-solution"),
+                max_errors=self.build_error_limit
             )
-            
-            # Build çıktısını detaylı logla
-            if build_result.stdout:
-                log_callback("\nBuild çıktısı:", "info")
-                log_callback(build_result.stdout, "info")
-            
-            if build_result.stderr:
-                log_callback("\nBuild hata çıktısı:", "error")
-                log_callback(build_result.stderr, "error")
+            self._log_process_output(build_result, "Build", log_callback)
             
             if build_result.returncode != 0:
                 log_callback(f"\nDerleme başarısız oldu. Hata kodu: {build_result.returncode}", "error")
@@ -488,28 +2923,24 @@ EndProject'''
             log_callback(f"\n{test_project_path.stem} projesinin testleri çalıştırılıyor...")
             
             # Detaylı test çıktısı için özel format kullan
-            test_result = subprocess.run(
-                [
-                    "dotnet", "test", str(test_project_path),
-                    "--no-build",
-                    "--logger:trx",
-                    "--logger:console;verbosity=detailed",
-                    "--collect:\"XPlat Code Coverage\""
-                ],
-                capture_output=True,
-                text=True
+            trx_path = self._trx_path(test_project_path)
+            trx_path.unlink(missing_ok=True)
+            test_result = run_streaming(
+                self._test_command(test_project_path, test_filter, collect_coverage=self.collect_coverage, trx_name=trx_path.name),
+                log_path=self._log_path(test_project_path, "test-all")
             )
             
             # Test sonuçlarını detaylı analiz et
             test_output = test_result.stdout
             test_error = test_result.stderr
             
+            # Test sonuçlarını TRX dosyasından say
+            trx_summary = summarize_test_cases(self.read_trx_results(trx_path))
+            passed_tests = trx_summary["passed"]
+            failed_tests = trx_summary["failed"]
+            skipped_tests = trx_summary["skipped"]
+            
             if test_output:
-                # Test sonuçlarını parse et
-                passed_tests = len(re.findall(r'Passed!', test_output))
-                failed_tests = len(re.findall(r'Failed!', test_output))
-                skipped_tests = len(re.findall(r'Skipped', test_output))
-                
                 # Test özetini oluştur
                 summary = f"""
 Test Sonuçları Özeti:
@@ -554,6 +2985,105 @@ Atlanmış: {skipped_tests} ⚠️
     
     def analyze_test_error(self, test_file: str, error_message: str, log_callback):
         """Test hatalarını analiz eder ve öneriler sunar."""
+        prompt = self.build_error_analysis_prompt(test_file, error_message)
+
+        log_callback("\nHata Analizi:", "info")
+
+        # Yanıt geldikçe tamamlanan satırları log'a yaz
+        pending = [""]
+
+        def stream_lines(delta: str):
+            lines = (pending[0] + delta).split("\n")
+            pending[0] = lines.pop()
+            for line in lines:
+                if line.strip():
+                    log_callback(line, "warning")
+
+        self.run_llm(prompt, is_analyzer=True, on_text=stream_lines)
+        if pending[0].strip():
+            log_callback(pending[0], "warning")
+
+    def analyze_test_errors(self, test_results: dict, log_callback):
+        """Başarısız test dosyalarının hata analizlerini aynı anda ister ve dosya sırasıyla loglar.
+
+        Akış modunda sıradaki dosyanın analizi geldikçe loglanır; diğerlerininki sırası gelene kadar biriktirilir.
+        """
+        failed = [(test_file, result["error"]) for test_file, result in test_results.items() if result.get("error")]
+        if not failed:
+            return
+
+        if self.stream_responses and len(failed) == 1:
+            test_file, error = failed[0]
+            log_callback(f"\nTest dosyası analizi: {test_file}", "warning")
+            self.analyze_test_error(test_file, error, log_callback)
+            return
+
+        if self.stream_responses:
+            self._stream_error_analyses(failed, log_callback)
+            return
+
+        prompts = [self.build_error_analysis_prompt(test_file, error) for test_file, error in failed]
+        responses = self.run_llm_batch(prompts, is_analyzer=True)
+        for (test_file, _), response in zip(failed, responses):
+            log_callback(f"\nTest dosyası analizi: {test_file}", "warning")
+            log_callback("\nHata Analizi:", "info")
+            log_callback(response, "warning")
+
+    def _stream_error_analyses(self, failed: list, log_callback):
+        """Analizleri paralel akış halinde ister; satırları dosyalar karışmadan, sırayla loglar."""
+        lock = threading.Lock()
+        buffers = [
+            [(f"\nTest dosyası analizi: {test_file}", "warning"), ("\nHata Analizi:", "info")]
+            for test_file, _ in failed
+        ]
+        pending = [""] * len(failed)
+        done = [False] * len(failed)
+        head = [0]
+
+        def emit(index: int, line: str, level: str = "warning"):
+            with lock:
+                if index == head[0]:
+                    log_callback(line, level)
+                else:
+                    buffers[index].append((line, level))
+
+        def flush_head():
+            # Çağıran kilidi tutar; sırası gelen dosyanın biriken satırları yazılır
+            while head[0] < len(failed):
+                for line, level in buffers[head[0]]:
+                    log_callback(line, level)
+                buffers[head[0]] = []
+                if not done[head[0]]:
+                    break
+                head[0] += 1
+
+        def analyze(index: int):
+            def stream_lines(delta: str):
+                lines = (pending[index] + delta).split("\n")
+                pending[index] = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        emit(index, line)
+
+            try:
+                test_file, error = failed[index]
+                self.run_llm(self.build_error_analysis_prompt(test_file, error), is_analyzer=True, on_text=stream_lines)
+                if pending[index].strip():
+                    emit(index, pending[index])
+            finally:
+                with lock:
+                    done[index] = True
+                    if index == head[0]:
+                        head[0] += 1
+                        flush_head()
+
+        with lock:
+            flush_head()
+        with ThreadPoolExecutor(max_workers=min(len(failed), self.llm_client.max_in_flight)) as pool:
+            list(pool.map(analyze, range(len(failed))))
+
+    def build_error_analysis_prompt(self, test_file: str, error_message: str) -> str:
+        """Test hatası analizi için LLM prompt'unu oluşturur."""
         # Test sonuçlarından mesajları ayıkla
         messages = []
         if isinstance(error_message, str):
@@ -567,7 +3097,7 @@ Atlanmış: {skipped_tests} ⚠️
         # Analiz için mesajları birleştir
         error_details = "\n".join(messages) if messages else error_message
         
-        prompt = f"""Analyze this C# test error and provide specific recommendations:
+        return f"""Analyze this C# test error and provide specific recommendations:
 
 Test File: {test_file}
 Error Details:
@@ -581,16 +3111,69 @@ Please provide:
 5. Recommendations for improving the test
 
 Focus on actionable, specific advice based on the error messages."""
-
-        response = ""
-        for message in self.run_llm(prompt, is_analyzer=True):
-            response += str(message)
-        
-        log_callback("\nHata Analizi:", "info")
-        log_callback(response, "warning")
     
-    def analyze_source_code(self, source_code: str) -> dict:
-        """Kaynak koddan önemli bilgileri çıkarır."""
+    @staticmethod
+    def analyze_source_code(source_code: str) -> dict:
+        """Kaynak koddan önemli bilgileri çıkarır.
+
+        Kod parse_csharp_outline ile tek geçişte taranır. Test edilecek sınıf, public
+        sınıf/record/struct'lar arasında en çok public metodu olan tiptir.
+        """
+        outline = parse_csharp_outline(source_code)
+        candidates = [t for t in outline.types if t.kind in ("class", "record", "struct", "record struct") and "static" not in t.modifiers]
+        candidates = [t for t in candidates if "public" in t.modifiers] or candidates
+        target = max(
+            candidates,
+            key=lambda t: sum(1 for m in t.members if m.kind == "method" and "public" in m.modifiers),
+            default=None
+        )
+
+        constructors = []
+        methods = []
+        dependencies = []
+        if target:
+            constructor_parameters = [m.parameters for m in target.members if m.kind == "constructor"]
+            if target.primary_constructor is not None:
+                constructor_parameters.insert(0, target.primary_constructor)
+            constructors = constructor_parameters
+            for member in target.members:
+                if member.kind != "method" or "public" not in member.modifiers:
+                    continue
+                methods.append({
+                    'name': member.name,
+                    'return_type': member.return_type,
+                    'parameters': member.parameters,
+                    'type_parameters': member.type_parameters,
+                    'is_async': "async" in member.modifiers,
+                    'is_static': "static" in member.modifiers,
+                    'line': member.line
+                })
+
+            # Bağımlılıklar: constructor parametre tipleri (yerleşik tipler hariç) ve readonly alanların tipleri
+            for parameters in constructor_parameters:
+                for parameter_type, _ in split_csharp_parameters(parameters):
+                    if parameter_type.rstrip('?[]') in CSHARP_BUILTIN_TYPES:
+                        continue
+                    if parameter_type not in dependencies:
+                        dependencies.append(parameter_type)
+            for member in target.members:
+                if member.kind == "field" and "readonly" in member.modifiers and "static" not in member.modifiers \
+                        and member.return_type not in dependencies:
+                    dependencies.append(member.return_type)
+
+        return {
+            'namespace': target.namespace if target else (outline.namespaces[0] if outline.namespaces else None),
+            'using_statements': outline.using_statements,
+            'class_name': target.name if target else None,
+            'constructors': constructors,
+            'methods': methods,
+            'dependencies': dependencies,
+            'types': [t.full_name for t in outline.types]
+        }
+
+    @staticmethod
+    def _analyze_source_code_regex(source_code: str) -> dict:
+        """Eski regex tabanlı analiz; yalnızca karşılaştırma (benchmark-parser) için tutulur."""
         # Namespace'i bul
         namespace_match = re.search(r'namespace\s+([\w\.]+)', source_code)
         namespace = namespace_match.group(1) if namespace_match else None
@@ -637,38 +3220,132 @@ Focus on actionable, specific advice based on the error messages."""
             'dependencies': dependencies
         }
 
-    def generate_and_fix_test(self, cs_file: Path, tests_proj_dir: Path, project_name: str, previous_errors: list, attempt: int, max_attempts: int, log_callback) -> tuple[bool, str]:
-        """Test dosyasını oluşturur ve hatalara göre düzeltir."""
-        if attempt > max_attempts:
-            log_callback(f"Maksimum deneme sayısına ulaşıldı ({max_attempts}). Test oluşturma işlemi durduruldu.", "error")
-            return False, None
+    def find_dependency_signatures(self, type_names: List[str], exclude: str = None) -> dict:
+        """Sembol dizininden verilen tiplerin imzalarını döndürür (tam ad -> imza)."""
+        signatures = {}
+        if self.symbol_index is None:
+            return signatures
+        for type_name in type_names:
+            for symbol in self.symbol_index.lookup(type_name):
+                if symbol["name"] != exclude and symbol["full_name"] not in signatures:
+                    signatures[symbol["full_name"]] = symbol["signature"]
+        return signatures
 
-        try:
-            test_file_name = f"{cs_file.stem}UnitTest.cs"
-            test_file_path = tests_proj_dir / test_file_name
+    def build_source_context(self, source_code: str, code_analysis: dict, target_methods: set = None) -> str:
+        """Prompt için kaynaktan yalnızca alanları, constructor'ı, hedef metodları ve bağımlılık arayüzlerini çıkarır.
 
-            # Kaynak dosya içeriğini oku ve analiz et
-            with open(cs_file, 'r', encoding='utf-8') as f:
-                source_code = f.read()
-            
-            code_analysis = self.analyze_source_code(source_code)
-            
-            # İlk denemede veya dosya yoksa tüm kodu oluştur
-            if attempt == 1 or not test_file_path.exists():
-                error_context = ""
-                if previous_errors:
-                    error_context = "\nPrevious errors that need to be fixed:\n" + "\n".join(previous_errors)
+        Kaynağın tamamı token bütçesine sığıyorsa olduğu gibi (özellikleri, iç tipleri ve enum'larıyla)
+        kullanılır ve kalan bütçeye bağımlılık imzaları eklenir. Sığmıyorsa üye aralıkları
+        parse_csharp_outline'ın tek geçişinden alınır; bölümler öncelik sırasıyla bütçe dolana kadar
+        eklenir, bütçeye sığmayan metodlar yalnızca imzalarıyla, o da sığmıyorsa hiç yer almaz.
+        Bütçe None ise kaynak kodun tamamı döner.
+        """
+        if self.context_token_budget is None:
+            return source_code
 
-                # Metod listesini oluştur
-                method_details = []
-                for method in code_analysis['methods']:
-                    method_details.append(f"""Method: {method['name']}
+        class_name = code_analysis['class_name']
+
+        # Hedef metodlar; hedef verilmediyse tüm public metodlar
+        methods = code_analysis['methods']
+        if target_methods:
+            methods = [m for m in methods if any(name in m['name'] for name in target_methods)] or methods
+        method_names = {method['name'] for method in methods}
+
+        # Solution'daki tiplerin imzaları: önce constructor bağımlılıkları, sonra hatalarda adı geçen
+        # tipler, en son metod parametre/dönüş tiplerinde kullanılan tipler
+        referenced_types = []
+        for method in methods:
+            referenced_types.extend(re.findall(r'\b[A-Z]\w*', f"{method['return_type']} {method['parameters']}"))
+        type_names = list(code_analysis['dependencies']) + sorted(target_methods or []) + referenced_types
+        interface_sections = list(self.find_dependency_signatures(type_names, exclude=class_name).values())
+
+        context_parts = []
+        budget = self.context_token_budget
+        state = {"used": 0}
+
+        def add(section: str) -> bool:
+            cost = estimate_tokens(section)
+            if state["used"] + cost > budget:
+                return False
+            context_parts.append(section)
+            state["used"] += cost
+            return True
+
+        if add(source_code):
+            for interface_source in interface_sections:
+                add(interface_source)
+            return "\n\n".join(context_parts)
+
+        outline = parse_csharp_outline(source_code)
+        target = next((t for t in outline.types if t.name == class_name and t.header_start >= 0), None)
+        members = target.members if target else []
+
+        def member_source(member: CSharpMember) -> str:
+            return source_code[member.start:member.end].strip()
+
+        # Sınıf bildirimi, alanlar ve constructor'lar; sığmayan constructor imzasıyla eklenir
+        if target:
+            add(source_code[target.header_start:target.header_end].strip())
+        fields = [member_source(m) for m in members if m.kind == "field" and m.start >= 0]
+        if fields and not add("\n".join(fields)):
+            for field_source in fields:
+                add(field_source)
+        for member in members:
+            if member.kind == "constructor" and member.start >= 0 and not add(member_source(member)):
+                add(f"{member.name}({member.parameters}) {{ /* body omitted */ }}")
+
+        # Metodlar tam halleriyle, sığmayanlar imzalarıyla
+        for member in members:
+            if member.kind != "method" or member.name not in method_names or member.start < 0:
+                continue
+            if not add(member_source(member)):
+                add(f"{member.return_type} {member.name}{member.type_parameters}({member.parameters}) {{ /* body omitted */ }}")
+        for interface_source in interface_sections:
+            add(interface_source)
+
+        return "\n\n".join(context_parts)
+
+    def _error_symbol_names(self, errors: list) -> set:
+        """Derleme hata mesajlarından adı geçen metod/tip adlarını çıkarır."""
+        names = set()
+        # Metod adı kalıpları için regex'ler
+        patterns = [
+            r"The name '(\w+)' does not exist",
+            r"Cannot find method '(\w+)'",
+            r"'(\w+)' is inaccessible",
+            r"Method '(\w+)' not found",
+            r"(\w+)\s*\(.*?\) is not defined",
+            r"No overload for method '(\w+)'",
+            r"Cannot convert from '(\w+)' to '(\w+)'",
+            r"Argument (\d+): cannot convert from '(\w+)' to '(\w+)'",
+            r"'(\w+)' does not contain a definition for '(\w+)'",
+        ]
+        for error in errors:
+            for pattern in patterns:
+                for match in re.finditer(pattern, error, re.IGNORECASE):
+                    if match.lastindex == 1:
+                        names.add(match.group(1))
+                    else:
+                        # Tip dönüşüm hatalarında her iki tipi de ekle
+                        names.update(match.groups()[1:])
+        return names
+
+    def build_generation_prompt(self, source_code: str, code_analysis: dict, project_name: str, previous_errors: list) -> str:
+        """İlk test üretimi için LLM prompt'unu oluşturur."""
+        error_context = ""
+        if previous_errors:
+            error_context = "\nPrevious errors that need to be fixed:\n" + "\n".join(previous_errors)
+
+        # Metod listesini oluştur
+        method_details = []
+        for method in code_analysis['methods']:
+            method_details.append(f"""Method: {method['name']}
 Return Type: {method['return_type']}
 Parameters: {method['parameters']}
 """)
-                methods_info = "\n".join(method_details)
+        methods_info = "\n".join(method_details)
 
-                prompt = f"""IMPORTANT: Generate a COMPLETE C# test file with FULL implementation.
+        return f"""IMPORTANT: Generate a COMPLETE C# test file with FULL implementation.
 
 Source Code Analysis:
 --------------------
@@ -686,7 +3363,7 @@ Public Methods to Test:
 {methods_info}
 
 Source code:
-{source_code}
+{self.build_source_context(source_code, code_analysis)}
 
 {error_context}
 
@@ -722,6 +3399,81 @@ REQUIREMENTS:
 8. Mock all external dependencies:
    {chr(10).join(f"_mock{dep.replace('I', '')}.Setup(...).Returns/ReturnsAsync(...);" for dep in code_analysis['dependencies'])}"""
 
+    def request_fixed_test_code(self, prompt: str, current_code: str, kind: str, attempt: int, log_callback, rewrite_instruction: str = "") -> str:
+        """Düzeltme prompt'unu LLM'e gönderir ve düzeltilmiş test kodunu döndürür.
+
+        Yama modunda model yalnızca değişen satırları unified diff olarak döndürür; diff mevcut
+        koda uygulanamazsa aynı prompt tam kod isteğiyle tekrar gönderilir.
+        """
+        if self.patch_mode and current_code.strip():
+            diff = self.run_llm(
+                f"{prompt}\n\n{PATCH_RESPONSE_INSTRUCTIONS}",
+                kind=f"{kind}_patch",
+                attempt=attempt,
+                stop_at_compilation_unit=False
+            )
+            stats = getattr(self._local, "stats", None)
+            try:
+                patched = apply_unified_diff(current_code, diff)
+                if stats is not None:
+                    stats["patches_applied"] += 1
+                log_callback(f"Düzeltme yama olarak uygulandı ({len(diff.splitlines())} satırlık diff).", "info")
+                return patched
+            except ValueError as e:
+                if stats is not None:
+                    stats["patch_fallbacks"] += 1
+                log_callback(f"Yama uygulanamadı, tam kod isteniyor: {str(e)}", "warning")
+
+        full_prompt = f"{prompt}\n\n{rewrite_instruction}" if rewrite_instruction else prompt
+        return self.run_llm(full_prompt, kind=kind, attempt=attempt)
+
+    def _structural_errors(self, test_code: str) -> List[str]:
+        """Kodun yapısal hatalarını prompt'a uygun metinler olarak döndürür ve istatistiğe işler."""
+        errors = [
+            f"Error {code} at line {line}, column {column}: {message}"
+            for line, column, code, message in validate_csharp_structure(test_code)
+        ]
+        if errors:
+            self._count_precheck_failure()
+        return errors
+
+    def _count_precheck_failure(self):
+        stats = getattr(self._local, "stats", None)
+        if stats is not None:
+            with self._stats_lock:
+                stats["precheck_failures"] += 1
+
+    def _precheck_build(self, test_file_path: Path, log_callback) -> StreamedProcessResult:
+        """Test dosyası yapısal olarak bozuksa build yerine MSBuild biçiminde hata sonucu döndürür."""
+        errors = validate_csharp_structure(test_file_path.read_text(encoding='utf-8'))
+        if not errors:
+            return None
+        self._count_precheck_failure()
+        log_callback(f"Yapısal ön kontrol başarısız, dotnet build atlandı: {test_file_path.name}", "warning")
+        error_lines = [f"{test_file_path}({line},{column}): error {code}: {message}" for line, column, code, message in errors]
+        return StreamedProcessResult(1, deque(), deque(), error_lines, None, False)
+
+    def generate_and_fix_test(self, cs_file: Path, tests_proj_dir: Path, project_name: str, previous_errors: list, attempt: int, max_attempts: int, log_callback) -> tuple[bool, str]:
+        """Test dosyasını oluşturur ve hatalara göre düzeltir."""
+        if attempt > max_attempts:
+            log_callback(f"Maksimum deneme sayısına ulaşıldı ({max_attempts}). Test oluşturma işlemi durduruldu.", "error")
+            return False, None
+
+        try:
+            test_file_name = f"{cs_file.stem}UnitTest.cs"
+            test_file_path = tests_proj_dir / test_file_name
+
+            # Kaynak dosya içeriğini oku ve analiz et
+            with open(cs_file, 'r', encoding='utf-8') as f:
+                source_code = f.read()
+            
+            code_analysis = self.analyze_source_code(source_code)
+            existing_code = None
+            
+            # İlk denemede veya dosya yoksa tüm kodu oluştur
+            if attempt == 1 or not test_file_path.exists():
+                prompt = self.build_generation_prompt(source_code, code_analysis, project_name, previous_errors)
+
             else:
                 # Sonraki denemelerde mevcut kodu oku ve hataları düzelt
                 with open(test_file_path, 'r', encoding='utf-8') as f:
@@ -731,29 +3483,7 @@ REQUIREMENTS:
                 error_details = "\n".join(previous_errors[-3:])
 
                 # Hata mesajlarından test edilen metod adlarını bul
-                method_names = set()
-                for error in previous_errors:
-                    # Metod adı kalıpları için regex'ler
-                    patterns = [
-                        r"The name '(\w+)' does not exist",
-                        r"Cannot find method '(\w+)'",
-                        r"'(\w+)' is inaccessible",
-                        r"Method '(\w+)' not found",
-                        r"(\w+)\s*\(.*?\) is not defined",
-                        r"No overload for method '(\w+)'",
-                        r"Cannot convert from '(\w+)' to '(\w+)'",
-                        r"Argument (\d+): cannot convert from '(\w+)' to '(\w+)'",
-                        r"'(\w+)' does not contain a definition for '(\w+)'",
-                    ]
-                    
-                    for pattern in patterns:
-                        matches = re.finditer(pattern, error, re.IGNORECASE)
-                        for match in matches:
-                            if match.lastindex == 1:
-                                method_names.add(match.group(1))
-                            else:
-                                # Tip dönüşüm hatalarında her iki tipi de ekle
-                                method_names.update(match.groups()[1:])
+                method_names = self._error_symbol_names(previous_errors)
 
                 # İlgili metodları bul
                 relevant_methods = []
@@ -783,8 +3513,8 @@ Dependencies: {', '.join(code_analysis['dependencies'])}
 Build errors to fix:
 {error_details}
 
-Full source code for reference:
-{source_code}
+Source code for reference:
+{self.build_source_context(source_code, code_analysis, method_names)}
 
 REQUIREMENTS:
 1. Keep the existing code structure
@@ -801,8 +3531,11 @@ REQUIREMENTS:
             log_callback(f"\nTest kodu {attempt}. deneme {'oluşturuluyor' if attempt == 1 else 'düzeltiliyor'}...")
             start_time = time.time()
 
-            # LLM'den yanıt al
-            response = self.run_llm(prompt, is_analyzer=False)
+            # LLM'den yanıt al; düzeltmelerde yama modu kullanılabilir
+            if existing_code is None:
+                response = self.run_llm(prompt, is_analyzer=False, kind="generate", attempt=attempt)
+            else:
+                response = self.request_fixed_test_code(prompt, existing_code, "fix", attempt, log_callback)
             test_code = response.strip()
 
             # Markdown kod bloklarını ve gereksiz karakterleri temizle
@@ -824,6 +3557,15 @@ REQUIREMENTS:
             with open(test_file_path, 'w', encoding='utf-8') as f:
                 f.write(test_code)
 
+            # Yapısal hatalar dotnet build beklenmeden düzeltme prompt'una geri gönderilir
+            structural_errors = self._structural_errors(test_code)
+            if structural_errors and attempt < max_attempts:
+                log_callback("Üretilen kodda yapısal hatalar var, build atlanıyor:", "warning")
+                for error in structural_errors:
+                    log_callback(error, "warning")
+                previous_errors.extend(structural_errors)
+                return self.generate_and_fix_test(cs_file, tests_proj_dir, project_name, previous_errors, attempt + 1, max_attempts, log_callback)
+
             log_callback(f"Test kodu {'oluşturuldu' if attempt == 1 else 'düzeltildi'}: {test_file_path}", "success")
             return True, test_file_path
 
@@ -836,7 +3578,16 @@ REQUIREMENTS:
         path = Path(source_path)
         cs_files = self.find_cs_files(path)
         test_results = {}
-        max_attempts = 5  # Maksimum deneme sayısını 5'e çıkardık
+        max_attempts = self.max_attempts
+        self.file_stats = {}
+        self.llm_calls = []
+        self.build_executor.reset()
+        self._log_callback = log_callback
+        
+        # Shard modunda dosyaların yalnızca bu parçaya düşen kısmını işle
+        if self.shard_count > 1:
+            cs_files = sorted(cs_files, key=lambda p: p.relative_to(path).as_posix())[self.shard_index::self.shard_count]
+            log_callback(f"Shard {self.shard_index + 1}/{self.shard_count}: {len(cs_files)} dosya işlenecek.", "info")
         
         try:
             # Solution dosyasını bul
@@ -865,6 +3616,10 @@ REQUIREMENTS:
                     csproj_files = self.find_csproj_files(solution_dir)
                     log_callback(f"Bulunan .csproj dosyaları: {len(csproj_files)}", "info")
                     
+                    # Yalnızca test edilen dosyaların projeleri ve onların referansları eklenir
+                    if self.prune_references:
+                        csproj_files = self.select_project_references(cs_files, csproj_files, log_callback)
+                    
                     for csproj_file in csproj_files:
                         # Proje referansını ekle
                         source_project_path = os.path.relpath(csproj_file, tests_proj_dir)
@@ -905,12 +3660,7 @@ REQUIREMENTS:
   </PropertyGroup>
 
   <ItemGroup>
-    <PackageReference Include=\"Microsoft.NET.Test.Sdk\" Version=\"17.9.0\" />
-    <PackageReference Include=\"xunit\" Version=\"2.6.6\" />
-    <PackageReference Include=\"xunit.runner.visualstudio\" Version=\"2.5.6\" />
-    <PackageReference Include=\"coverlet.collector\" Version=\"6.0.0\" />
-    <PackageReference Include=\"Moq\" Version=\"4.20.70\" />
-    <PackageReference Include=\"FluentAssertions\" Version=\"6.12.0\" />
+    {package_refs_xml(PINNED_TEST_PACKAGES)}
   </ItemGroup>
 
   <ItemGroup>
@@ -921,61 +3671,638 @@ REQUIREMENTS:
                     f.write(csproj_content)
                 log_callback(f"Test proje dosyası oluşturuldu: {csproj_path}", "success")
                 log_callback(f"Proje referansları: {project_references}", "info")
+            elif self.prune_references:
+                self.add_missing_project_references(csproj_path, cs_files, solution_dir, log_callback)
+            
+            # Solution genelindeki tip imzalarını güncelle; yalnızca değişen dosyalar yeniden parse edilir
+            index_start = time.perf_counter()
+            self.symbol_index = SymbolIndex(tests_proj_dir, solution_dir)
+            index_counts = self.symbol_index.update(self.find_cs_files(solution_dir))
+            log_callback(
+                f"Sembol dizini: {index_counts['parsed']} dosya parse edildi, {index_counts['unchanged']} değişmedi, "
+                f"{index_counts['removed']} silindi ({time.perf_counter() - index_start:.2f}s)", "info"
+            )
+
+            # Kaynağı ve testi değişmemiş, son çalıştırmada başarılı olan dosyaları atla
+            manifest = TestManifest(tests_proj_dir, solution_dir)
+            if self.skip_unchanged:
+                changed_files = [
+                    cs_file for cs_file in cs_files
+                    if not manifest.is_green(cs_file, tests_proj_dir / f"{cs_file.stem}UnitTest.cs")
+                ]
+                skipped = len(cs_files) - len(changed_files)
+                for cs_file in set(cs_files) - set(changed_files):
+                    self.file_stats[str(cs_file)] = self._new_file_stats(cs_file, outcome="skipped")
+                if skipped:
+                    log_callback(f"Değişmemiş ve başarılı {skipped} dosya atlandı.", "info")
+                cs_files = changed_files
+                if not cs_files:
+                    log_callback("Tüm testler güncel, yeniden oluşturulacak dosya yok.", "success")
+                    return test_results
             
             # Test projesini solution'a ekle
             if not self.add_project_to_solution(solution_path, tests_proj_dir, log_callback):
                 log_callback("Test projesi solution'a eklenemedi!", "error")
                 return test_results
             
-            # Solution'ı restore et
-            log_callback("\nSolution restore ediliyor...")
-            restore_result = subprocess.run(
-                ["dotnet", "restore", str(solution_path), "--verbosity", "detailed"],
-                capture_output=True,
-                text=True,
-                cwd=solution_dir
-            )
+            # Solution'ı restore et; proje grafiği değişmediyse atla
+            self._prepare_package_feed(tests_proj_dir, log_callback)
+            restore_fingerprint = self._restore_fingerprint(tests_proj_dir, solution_dir, log_callback)
+            if restore_fingerprint is not None:
+                log_callback("\nSolution restore ediliyor...")
+                # Referanslar budanmışsa test projesi restore edilir (referansladığı projeler dahil)
+                restore_target = csproj_path if self.prune_references else solution_path
+                restore_result = run_streaming(
+                    ["dotnet", "restore", str(restore_target), "--verbosity", "detailed"] + self._restore_arguments,
+                    cwd=solution_dir,
+                    log_path=self._log_path(tests_proj_dir, "restore")
+                )
+                if restore_result.returncode == 0:
+                    restore_fingerprint.record()
             
-            if restore_result.returncode != 0:
+            if restore_fingerprint is not None and restore_result.returncode != 0:
                 log_callback(f"\nRestore işlemi başarısız oldu. Hata kodu: {restore_result.returncode}", "error")
+                self._log_process_output(restore_result, "Restore", log_callback)
                 if csproj_path.exists():
                     with open(csproj_path, 'r', encoding='utf-8') as f:
                         log_callback("\nTest proje dosyası içeriği:", "info")
                         log_callback(f.read(), "info")
                 return test_results
             
-            # Her kaynak dosya için test oluştur ve çalıştır
-            for cs_file in cs_files:
-                log_callback(f"\nTest oluşturuluyor: {cs_file}")
-                
-                # Recursive test oluşturma ve düzeltme işlemi
-                file_results = self.build_and_test(
+            # Hedefli build için bağımlı projeleri bir kez tam olarak derle
+            self._dependencies_built = False
+            if self.targeted_build:
+                log_callback("\nSolution ilk kez tam olarak derleniyor...")
+                full_build_result = self.build_executor.run(
+                    self._build_command(solution_path, tests_proj_dir),
+                    cwd=solution_dir,
+                    log_path=self._log_path(tests_proj_dir, "build-full")
+                )
+                if full_build_result.returncode == 0:
+                    self._dependencies_built = True
+                    log_callback("Tam build başarılı, sonraki build'ler yalnızca test projesini derleyecek.", "success")
+                else:
+                    log_callback("Tam build başarısız, ilk başarılı build'e kadar solution derlenecek.", "warning")
+            
+            # İlk üretim istekleri build'lerle örtüşecek şekilde önceden gönderilir
+            if self.prefetch_generation and len(cs_files) > 1:
+                self.prefetch_initial_tests(cs_files, log_callback)
+            
+            # Paralel modda dosyaları işçi havuzunda işle
+            if self.max_workers > 1 and len(cs_files) > 1:
+                test_results.update(self.run_pipeline(
+                    cs_files,
                     solution_path,
                     tests_proj_dir,
-                    cs_file,
                     solution_dir,
                     max_attempts,
-                    log_callback
+                    log_callback,
+                    manifest=manifest
+                ))
+            else:
+                # Her kaynak dosya için test oluştur ve çalıştır
+                for cs_file in cs_files:
+                    log_callback(f"\nTest oluşturuluyor: {cs_file}")
+                    
+                    # Recursive test oluşturma ve düzeltme işlemi
+                    file_results = self.process_file(
+                        solution_path,
+                        tests_proj_dir,
+                        cs_file,
+                        solution_dir,
+                        max_attempts,
+                        log_callback
+                    )
+                    
+                    self._record_outcome(manifest, cs_file, tests_proj_dir, file_results)
+                    test_results.update(file_results)
+            
+            # Dosya bazında filtreli çalıştırıldıysa veya kapsam isteniyorsa tüm paketi sonda bir kez çalıştır
+            if self.filter_tests or self.collect_coverage:
+                self.full_suite_result = self.run_full_suite(
+                    solution_path,
+                    tests_proj_dir,
+                    solution_dir,
+                    log_callback,
+                    collect_coverage=self.collect_coverage
                 )
-                
-                test_results.update(file_results)
             
         except FileNotFoundError as e:
             log_callback(str(e), "error")
+        finally:
+            # Sıcak tutulan build sunucularını çalıştırma sonunda kapat
+            build_summary = self.build_executor.summary()
+            if build_summary["builds"]:
+                log_callback(
+                    f"\nBuild'ler: {build_summary['builds']} toplam, {build_summary['warm']} sıcak "
+                    f"(ort. {build_summary['warm_avg_duration'] or 0:.2f}s), {build_summary['cold']} soğuk "
+                    f"(ort. {build_summary['cold_avg_duration'] or 0:.2f}s)",
+                    "info"
+                )
+            self.build_executor.shutdown(log_callback)
         
         return test_results
 
-    def build_and_test(self, solution_path: Path, tests_proj_dir: Path, cs_file: Path, solution_dir: Path, max_attempts: int, log_callback) -> dict:
-        """Build işlemini yapar ve hata durumunda testleri düzeltir."""
+    def _build_command(self, solution_path: Path, tests_proj_dir: Path) -> list:
+        """Build komutunu oluşturur; hedefli modda bağımlılıklar hazırsa yalnızca test projesi derlenir.
+
+        Referanslar budanmışsa solution yerine test projesi (ve referansladığı projeler) derlenir.
+        """
+        build_target = str(tests_proj_dir / "Tests.csproj") if self.prune_references else str(solution_path)
+        if not self.targeted_build:
+            return ["dotnet", "build", build_target, "--no-restore", "-v:d"]
+        if self._dependencies_built:
+            return ["dotnet", "build", str(tests_proj_dir / "Tests.csproj"), "--no-restore", "--no-dependencies", "-nologo", "-v:m"]
+        return ["dotnet", "build", build_target, "--no-restore", "-nologo", "-v:m"]
+
+    def _log_path(self, tests_proj_dir: Path, name: str) -> Path:
+        """dotnet çıktısının yazılacağı log dosyasının yolunu döndürür."""
+        return tests_proj_dir.parent / "logs" / f"{name}.log"
+
+    def _log_process_output(self, result: StreamedProcessResult, title: str, log_callback):
+        """Komutun hata satırlarını ve tam log dosyasının yolunu loglar."""
+        if result.error_lines:
+            log_callback(f"\n{title} hataları:", "error")
+            log_callback("\n".join(result.error_lines), "error")
+        if result.stderr:
+            log_callback(f"\n{title} hata çıktısı:", "error")
+            log_callback(result.stderr, "error")
+        if result.log_path:
+            log_callback(f"{title} tam çıktısı: {result.log_path}", "info")
+
+    def _trx_path(self, tests_proj_dir: Path, trx_name: str = None) -> Path:
+        """Test çalıştırmasının TRX dosya yolunu döndürür."""
+        return tests_proj_dir / "TestResults" / (trx_name or "TestRun.trx")
+
+    def _test_command(self, tests_proj_dir: Path, test_filter: str = None, collect_coverage: bool = False, trx_name: str = None) -> list:
+        """dotnet test komutunu oluşturur; filtre verilirse yalnızca eşleşen testler çalışır."""
+        trx_path = self._trx_path(tests_proj_dir, trx_name)
+        command = [
+            "dotnet", "test", str(tests_proj_dir),
+            "--no-build",
+            "--logger:console;verbosity=detailed",
+            # Sabit isimli TRX her çalıştırmada üzerine yazılır, sonuçlar buradan okunur
+            f"--logger:trx;LogFileName={trx_path.name}",
+            "--results-directory", str(trx_path.parent)
+        ]
+        # Cobertura çıktısı yalnızca kapsam geçişinde üretilir
+        if collect_coverage:
+            command.extend(["--collect", "XPlat Code Coverage"])
+        if test_filter:
+            command.extend(["--filter", test_filter])
+        return command
+
+    def read_trx_results(self, trx_path: Path) -> List[TestCaseResult]:
+        """TRX dosyasındaki test sonuçlarını okur; dosya yoksa veya bozuksa boş liste döner."""
+        if not trx_path or not trx_path.exists():
+            return []
+        try:
+            return list(iter_trx_results(trx_path))
+        except ET.ParseError:
+            return []
+
+    def _report_coverage(self, results_dir: Path, since: float, log_callback):
+        """Bu çalıştırmada üretilen Cobertura dosyalarından satır/dal kapsamını loglar."""
+        coverage_files = [p for p in results_dir.rglob("coverage.cobertura.xml") if p.stat().st_mtime >= since]
+        if not coverage_files:
+            log_callback("Kapsam raporu bulunamadı.", "warning")
+            return None
+
+        coverage_file = max(coverage_files, key=lambda p: p.stat().st_mtime)
+        try:
+            root = ET.parse(coverage_file).getroot()
+            line_rate = float(root.get("line-rate", 0)) * 100
+            branch_rate = float(root.get("branch-rate", 0)) * 100
+        except (ET.ParseError, ValueError) as e:
+            log_callback(f"Kapsam raporu okunamadı: {str(e)}", "warning")
+            return None
+
+        log_callback(f"Kod kapsamı: satır %{line_rate:.1f}, dal %{branch_rate:.1f} ({coverage_file})", "success")
+        return {"file": str(coverage_file), "line_rate": line_rate, "branch_rate": branch_rate}
+
+    def _test_class_filter(self, project_name: str, cs_file: Path) -> str:
+        """Üretilen {project}.UnitTest.{Class}UnitTest sınıfı için test filtresi döndürür.
+
+        Sınıf adı, prompt'taki gibi kaynak analizinden alınır; dosya adı sınıf adından farklı
+        olabilir. Sınıf bulunamazsa dosya adı kullanılır.
+        """
+        try:
+            class_name = self.analyze_source_code(cs_file.read_text(encoding='utf-8'))['class_name']
+        except OSError:
+            class_name = None
+        return f"FullyQualifiedName~{project_name}.UnitTest.{class_name or cs_file.stem}UnitTest."
+
+    def run_full_suite(self, solution_path: Path, tests_proj_dir: Path, solution_dir: Path, log_callback, collect_coverage: bool = False) -> dict:
+        """Test projesini derleyip tüm testleri bir kez, istenirse kapsam ölçümüyle çalıştırır."""
+        log_callback(f"\nTüm test paketi {'kapsam ölçümüyle ' if collect_coverage else ''}çalıştırılıyor...", "info")
+        started = time.time()
+        build_result = self.build_executor.run(
+            self._build_command(solution_path, tests_proj_dir),
+            cwd=solution_dir,
+            log_path=self._log_path(tests_proj_dir, "build-suite"),
+            max_errors=self.build_error_limit
+        )
+        if build_result.returncode != 0:
+            log_callback(f"Test paketi derlenemedi. Hata kodu: {build_result.returncode}", "error")
+            self._log_process_output(build_result, "Build", log_callback)
+            return {"returncode": build_result.returncode, "output": build_result.stdout, "error": "\n".join(build_result.error_lines)}
+
+        trx_path = self._trx_path(tests_proj_dir, "FullSuite.trx")
+        trx_path.unlink(missing_ok=True)
+        test_result = run_streaming(
+            self._test_command(tests_proj_dir, collect_coverage=collect_coverage, trx_name=trx_path.name),
+            cwd=solution_dir,
+            log_path=self._log_path(tests_proj_dir, "test-suite")
+        )
+        summary = summarize_test_cases(self.read_trx_results(trx_path))
+        log_callback(
+            f"Toplam: {summary['total']}, Başarılı: {summary['passed']}, "
+            f"Başarısız: {summary['failed']}, Atlanmış: {summary['skipped']}",
+            "info"
+        )
+        if test_result.returncode == 0:
+            log_callback("Tüm test paketi başarıyla tamamlandı!", "success")
+        else:
+            log_callback("Test paketinde başarısız testler var.", "warning")
+            if test_result.stderr:
+                log_callback(test_result.stderr, "error")
+
+        coverage = None
+        if collect_coverage:
+            coverage = self._report_coverage(tests_proj_dir / "TestResults", started, log_callback)
+        return {"returncode": test_result.returncode, "output": test_result.stdout, "error": test_result.stderr, "summary": summary, "coverage": coverage}
+
+    @staticmethod
+    def _results_passed(file_results: dict) -> bool:
+        """Dosyanın tüm test sonuçları başarılıysa True döner."""
+        return bool(file_results) and all(result.get("error") is None for result in file_results.values())
+
+    def _record_outcome(self, manifest: TestManifest, cs_file: Path, tests_proj_dir: Path, file_results: dict):
+        """Dosyanın test sonucunu manifest'e işler."""
+        manifest.record(cs_file, tests_proj_dir / f"{cs_file.stem}UnitTest.cs", self._results_passed(file_results))
+
+    def _new_file_stats(self, cs_file: Path, outcome: str = "error") -> dict:
+        """Rapor için boş dosya istatistiği oluşturur."""
+        return {
+            "source": str(cs_file),
+            "outcome": outcome,
+            "attempts": 0,
+            "duration": 0.0,
+            "llm_calls": 0,
+            "cached_responses": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "llm_latency": 0.0,
+            "patches_applied": 0,
+            "patch_fallbacks": 0,
+            "precheck_failures": 0,
+            "llm_call_details": []
+        }
+
+    def process_file(self, solution_path: Path, tests_proj_dir: Path, cs_file: Path, solution_dir: Path, max_attempts: int, log_callback, staging_dir: Path = None, scratch_dir: Path = None) -> dict:
+        """Tek bir kaynak dosya için build_and_test çalıştırır ve rapor istatistiklerini toplar."""
+        stats = self._new_file_stats(cs_file)
+        self._local.stats = stats
+        self._local.log_callback = log_callback
+        started = time.time()
+        try:
+            file_results = self.build_and_test(
+                solution_path,
+                tests_proj_dir,
+                cs_file,
+                solution_dir,
+                max_attempts,
+                log_callback,
+                staging_dir=staging_dir,
+                scratch_dir=scratch_dir
+            )
+            stats["outcome"] = "passed" if self._results_passed(file_results) else "failed"
+            return file_results
+        finally:
+            stats["duration"] = round(time.time() - started, 3)
+            self._local.stats = None
+            self._local.log_callback = None
+            with self._stats_lock:
+                self.file_stats[str(cs_file)] = stats
+                cache_keys = self._file_cache_keys.pop(str(cs_file), [])
+            # Testleri geçmeyen dosyanın yanıtları sonraki çalıştırmada tekrar oynatılmasın
+            if self.llm_cache and stats["outcome"] != "passed":
+                for cache_key in cache_keys:
+                    self.llm_cache.delete(cache_key)
+
+    def build_report(self) -> dict:
+        """Son çalıştırmanın dosya bazında sonuçlarını JSON'a uygun sözlük olarak döndürür."""
+        files = sorted(self.file_stats.values(), key=lambda item: item["source"])
+        totals = {
+            "files": len(files),
+            "passed": sum(1 for item in files if item["outcome"] == "passed"),
+            "failed": sum(1 for item in files if item["outcome"] == "failed"),
+            "skipped": sum(1 for item in files if item["outcome"] == "skipped"),
+            "errors": sum(1 for item in files if item["outcome"] == "error"),
+            "duration": round(sum(item["duration"] for item in files), 3),
+            "llm_calls": sum(1 for call in self.llm_calls if not call.cached),
+            "llm_retries": self.llm_client.retry_count,
+            "patches_applied": sum(item["patches_applied"] for item in files),
+            "patch_fallbacks": sum(item["patch_fallbacks"] for item in files),
+            "precheck_failures": sum(item["precheck_failures"] for item in files),
+            "prompt_tokens": sum(call.prompt_tokens for call in self.llm_calls),
+            "completion_tokens": sum(call.completion_tokens for call in self.llm_calls),
+            "llm_latency": round(sum(call.latency for call in self.llm_calls if not call.cached), 3)
+        }
+        full_suite = None
+        if self.full_suite_result:
+            full_suite = {
+                "returncode": self.full_suite_result.get("returncode"),
+                "summary": self.full_suite_result.get("summary"),
+                "coverage": self.full_suite_result.get("coverage")
+            }
+        return {
+            "settings": {
+                "model": self.llm_settings["model"],
+                "max_attempts": self.max_attempts,
+                "max_workers": self.max_workers,
+                "shard_index": self.shard_index,
+                "shard_count": self.shard_count
+            },
+            "totals": totals,
+            "llm_by_kind": summarize_llm_calls(self.llm_calls),
+            "builds": self.build_executor.summary(),
+            "full_suite": full_suite,
+            "files": files
+        }
+
+    def run_pipeline(self, cs_files: List[Path], solution_path: Path, tests_proj_dir: Path, solution_dir: Path, max_attempts: int, log_callback, manifest: TestManifest = None) -> dict:
+        """Dosyaları sınırlı sayıda işçiyle paralel işler; LLM çağrıları build/test ile örtüşür."""
+        test_results = {}
+        log_queue = queue.Queue()
+
+        # Üretilen testler build sırası gelene kadar proje dışında bekletilir
+        staging_dir = tests_proj_dir.parent / "Tests.pending"
+        staging_dir.mkdir(exist_ok=True)
+
+        log_callback(f"\n{len(cs_files)} dosya {self.max_workers} işçi ile paralel işleniyor...", "info")
+        if self.isolated_builds:
+            log_callback("Her işçi kendi kopya test projesinde derleyip test edecek.", "info")
+
+        def process_file(cs_file: Path) -> dict:
+            # İşçi thread'leri log'u doğrudan değil kuyruk üzerinden yazar
+            def file_log(message: str, level: str = "info"):
+                text = str(message)
+                body = text.lstrip("\n")
+                log_queue.put((f"{text[:len(text) - len(body)]}[{cs_file.stem}] {body}", level))
+
+            file_log(f"\nTest oluşturuluyor: {cs_file}")
+            scratch_dir = self._acquire_scratch_project(tests_proj_dir, file_log) if self.isolated_builds else None
+            try:
+                return self.process_file(
+                    solution_path,
+                    tests_proj_dir,
+                    cs_file,
+                    solution_dir,
+                    max_attempts,
+                    file_log,
+                    staging_dir=None if scratch_dir else staging_dir,
+                    scratch_dir=scratch_dir
+                )
+            finally:
+                if scratch_dir:
+                    self._release_scratch_project(scratch_dir)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending = {executor.submit(process_file, cs_file): cs_file for cs_file in cs_files}
+            while pending:
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                self._drain_log_queue(log_queue, log_callback)
+                for future in done:
+                    cs_file = pending.pop(future)
+                    try:
+                        file_results = future.result()
+                        if manifest:
+                            self._record_outcome(manifest, cs_file, tests_proj_dir, file_results)
+                        test_results.update(file_results)
+                    except Exception as e:
+                        log_callback(f"[{cs_file.stem}] Test işlemi hatası: {str(e)}", "error")
+
+        self._drain_log_queue(log_queue, log_callback)
+        return test_results
+
+    def _drain_log_queue(self, log_queue: queue.Queue, log_callback):
+        """İşçilerden gelen log kayıtlarını çağıran thread üzerinde yazar."""
+        while True:
+            try:
+                message, level = log_queue.get_nowait()
+            except queue.Empty:
+                return
+            log_callback(message, level)
+
+    def _acquire_scratch_project(self, tests_proj_dir: Path, log_callback) -> Path:
+        """Boştaki bir kopya test projesini verir; yoksa Tests ile aynı derinlikte yenisini oluşturur.
+
+        Kopya proje yalnızca Tests.csproj'u içerir (göreli ProjectReference yolları aynı kalır)
+        ve csproj değişmedikçe bir kez restore edilir.
+        """
+        with self._scratch_lock:
+            if self._scratch_free:
+                scratch_dir = self._scratch_free.pop()
+            else:
+                scratch_dir = tests_proj_dir.parent / f"Tests_scratch{self._scratch_count}"
+                self._scratch_count += 1
+
+        scratch_dir.mkdir(exist_ok=True)
+        for stale_file in scratch_dir.glob("*.cs"):
+            stale_file.unlink()
+
+        csproj_content = (tests_proj_dir / "Tests.csproj").read_text(encoding='utf-8')
+        scratch_csproj = scratch_dir / "Tests.csproj"
+        csproj_changed = not scratch_csproj.exists() or scratch_csproj.read_text(encoding='utf-8') != csproj_content
+        if csproj_changed:
+            scratch_csproj.write_text(csproj_content, encoding='utf-8')
+        if csproj_changed or not (scratch_dir / "obj" / "project.assets.json").exists():
+            restore_result = run_streaming(
+                ["dotnet", "restore", str(scratch_csproj)] + self._restore_arguments,
+                log_path=self._log_path(tests_proj_dir, f"restore-{scratch_dir.name}")
+            )
+            if restore_result.returncode != 0:
+                self._log_process_output(restore_result, f"{scratch_dir.name} restore", log_callback)
+        return scratch_dir
+
+    def _release_scratch_project(self, scratch_dir: Path):
+        """Kopya projeyi sonraki kullanım için havuza geri verir."""
+        with self._scratch_lock:
+            self._scratch_free.append(scratch_dir)
+
+    def _build_scratch_project(self, scratch_dir: Path, tests_proj_dir: Path, solution_dir: Path, log_name: str, cancel_event: threading.Event = None) -> StreamedProcessResult:
+        """Kopya test projesini derler.
+
+        Bağımlılıklar derlendiyse yalnızca kopya proje --no-dependencies ile, kilitsiz ve paralel
+        derlenir; aksi halde ortak çıktıları yarıştırmamak için build sırası beklenir.
+        """
+        command = ["dotnet", "build", str(scratch_dir / "Tests.csproj"), "--no-restore", "-nologo", "-v:m"]
+        dependencies_built = self._dependencies_built
+        if dependencies_built:
+            command.append("--no-dependencies")
+        with nullcontext() if dependencies_built else self._build_lock:
+            build_result = self.build_executor.run(
+                command,
+                cwd=solution_dir,
+                log_path=self._log_path(tests_proj_dir, log_name),
+                max_errors=self.build_error_limit,
+                cancel_event=cancel_event
+            )
+        if build_result.returncode == 0:
+            self._dependencies_built = True
+        return build_result
+
+    def _candidate_sampling(self, index: int) -> dict:
+        """Aday için örnekleme ayarlarını döndürür; ilk aday varsayılan ayarları kullanır."""
+        if index == 0:
+            return {}
+        # Sıcaklık adaylar arasında yayılır, seed tekrarlanabilirlik (ve önbellek) için sabittir
+        temperature = round(min(1.0, 0.3 + 0.7 * index / max(1, self.candidates - 1)), 2)
+        seed_key = "seed" if self.llm_settings["provider"] == "ollama" else "random_seed"
+        return {"temperature": temperature, seed_key: index}
+
+    def _evaluate_candidate(self, index: int, test_code: str, scratch_dir: Path, tests_proj_dir: Path, test_file_name: str, solution_dir: Path, cancel_event: threading.Event, log_callback) -> dict:
+        """Adayı kopya projede derler ve testlerini çalıştırır."""
+        stem = Path(test_file_name).stem
+        (scratch_dir / test_file_name).write_text(test_code, encoding='utf-8')
+        result = {"index": index, "code": test_code, "build_result": None, "test_result": None, "trx_path": None}
+
+        result["build_result"] = self._precheck_build(scratch_dir / test_file_name, log_callback)
+        if result["build_result"]:
+            return result
+
+        result["build_result"] = self._build_scratch_project(
+            scratch_dir, tests_proj_dir, solution_dir, f"build-{stem}-cand{index}", cancel_event=cancel_event
+        )
+        if result["build_result"].returncode != 0 or cancel_event.is_set():
+            return result
+
+        trx_path = self._trx_path(scratch_dir, f"{stem}.trx")
+        trx_path.unlink(missing_ok=True)
+        result["trx_path"] = trx_path
+        result["test_result"] = run_streaming(
+            self._test_command(scratch_dir, trx_name=trx_path.name),
+            cwd=solution_dir,
+            log_path=self._log_path(tests_proj_dir, f"test-{stem}-cand{index}"),
+            cancel_event=cancel_event
+        )
+        return result
+
+    def run_speculative_candidates(self, cs_file: Path, tests_proj_dir: Path, solution_dir: Path, project_name: str, log_callback) -> tuple:
+        """K test adayını farklı sıcaklık/seed ile paralel üretir ve kopya projelerde dener.
+
+        Derlenip testleri geçen ilk aday kazanır; kalan build/test süreçleri durdurulur.
+        (kazanan veya None, denenen adaylar) döndürür.
+        """
+        with open(cs_file, 'r', encoding='utf-8') as f:
+            source_code = f.read()
+        prompt = self.build_generation_prompt(source_code, self.analyze_source_code(source_code), project_name, [])
+        test_file_name = f"{cs_file.stem}UnitTest.cs"
+        stats = getattr(self._local, "stats", None)
+        cancel_event = threading.Event()
+
+        def run_candidate(index: int) -> dict:
+            # Aday thread'lerinin LLM ölçümleri de dosyanın istatistiklerine yazılır
+            self._local.stats = stats
+            try:
+                test_code = self.run_llm(
+                    prompt,
+                    kind="generate" if index == 0 else "candidate",
+                    attempt=1,
+                    llm_kwargs=self._candidate_sampling(index),
+                    cancel_event=cancel_event
+                ).strip()
+                if not test_code or cancel_event.is_set():
+                    return None
+                scratch_dir = self._acquire_scratch_project(tests_proj_dir, log_callback)
+                try:
+                    return self._evaluate_candidate(index, test_code, scratch_dir, tests_proj_dir, test_file_name, solution_dir, cancel_event, log_callback)
+                finally:
+                    self._release_scratch_project(scratch_dir)
+            finally:
+                self._local.stats = None
+
+        log_callback(f"\n{self.candidates} test adayı paralel üretiliyor...", "info")
+        winner = None
+        tried = []
+        pool = ThreadPoolExecutor(max_workers=self.candidates)
+        try:
+            futures = [pool.submit(run_candidate, index) for index in range(self.candidates)]
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    log_callback(f"Aday hatası: {str(e)}", "error")
+                    continue
+                if result is None:
+                    continue
+                tried.append(result)
+                build_result, test_result = result["build_result"], result["test_result"]
+                if build_result.returncode == 0 and test_result is not None and test_result.returncode == 0:
+                    winner = result
+                    log_callback(f"Aday {result['index'] + 1} derlendi ve testleri geçti, diğer adaylar durduruluyor.", "success")
+                    break
+                state = "testleri başarısız" if build_result.returncode == 0 else f"{len(build_result.error_lines)} build hatası"
+                log_callback(f"Aday {result['index'] + 1}: {state}", "warning")
+        finally:
+            # Kaybeden adayların LLM akışları ve build/test süreçleri durdurulur; kazanan beklemeden döner
+            cancel_event.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return winner, tried
+
+    def _candidate_errors(self, candidate: dict) -> list:
+        """Başarısız adayın build hatalarını veya test hatası ayrıntılarını döndürür."""
+        if candidate["build_result"].returncode != 0:
+            return list(candidate["build_result"].error_lines)
+        return [
+            f"{case.name}\nMessage: {case.message}\n{case.stack_trace}".strip()
+            for case in self.read_trx_results(candidate["trx_path"])
+            if case.outcome in ("Failed", "Error", "Timeout", "Aborted")
+        ]
+
+    def build_and_test(self, solution_path: Path, tests_proj_dir: Path, cs_file: Path, solution_dir: Path, max_attempts: int, log_callback, staging_dir: Path = None, scratch_dir: Path = None) -> dict:
+        """Build işlemini yapar ve hata durumunda testleri düzeltir.
+
+        scratch_dir verilirse test işçiye ait kopya projede derlenip çalıştırılır ve yalnızca
+        sonuç alınan kod ana test projesine taşınır.
+        """
         attempt = 1
         previous_errors = []
         test_results = {}
 
-        # İlk önce test dosyasını oluştur
+        # Paralel modda test kodu önce staging dizinine veya işçinin kopya projesine yazılır
+        work_dir = scratch_dir or staging_dir or tests_proj_dir
+        build_dir = scratch_dir or tests_proj_dir
+
         project_name = cs_file.parent.name or "Project"
-        success, test_file_path = self.generate_and_fix_test(
+
+        # Spekülatif modda ilk deneme K aday ile yapılır
+        if self.candidates > 1:
+            winner, tried = self.run_speculative_candidates(cs_file, tests_proj_dir, solution_dir, project_name, log_callback)
+            stats = getattr(self._local, "stats", None)
+            if stats is not None:
+                stats["attempts"] = attempt
+            if winner:
+                test_file_path = tests_proj_dir / f"{cs_file.stem}UnitTest.cs"
+                with self._build_lock:
+                    test_file_path.write_text(winner["code"], encoding='utf-8')
+                log_callback(f"Test kodu oluşturuldu: {test_file_path}", "success")
+                return self.analyze_test_results(winner["test_result"], test_file_path, log_callback, trx_path=winner["trx_path"])
+
+            # Kazanan yoksa en az hatalı aday düzeltme döngüsünün başlangıcı olur
+            if tried and max_attempts > 1:
+                best = min(tried, key=lambda c: (c["build_result"].returncode != 0, len(self._candidate_errors(c))))
+                (work_dir / f"{cs_file.stem}UnitTest.cs").write_text(best["code"], encoding='utf-8')
+                previous_errors.extend(self._candidate_errors(best))
+                log_callback(f"Hiçbir aday geçmedi, aday {best['index'] + 1} düzeltilecek.", "warning")
+                attempt = 2
+
+        # İlk önce test dosyasını oluştur (veya en iyi adayı düzelt)
+        success, work_file_path = self.generate_and_fix_test(
             cs_file, 
-            tests_proj_dir, 
+            work_dir, 
             project_name, 
             previous_errors, 
             attempt, 
@@ -987,32 +4314,68 @@ REQUIREMENTS:
             log_callback("İlk test dosyası oluşturma başarısız oldu.", "error")
             return test_results
 
+        test_file_path = tests_proj_dir / work_file_path.name
+        trx_path = self._trx_path(build_dir, f"{test_file_path.stem}.trx")
+
         while attempt <= max_attempts:
-            # Build işlemini dene
-            build_result = subprocess.run(
-                ["dotnet", "build", str(solution_path), "--no-restore", "-v:d"],
-                capture_output=True,
-                text=True,
-                cwd=solution_dir
-            )
+            stats = getattr(self._local, "stats", None)
+            if stats is not None:
+                stats["attempts"] = attempt
+            test_result = None
+            # Kopya projeler birbirinden bağımsız derlenir, ortak proje ise sırayla
+            with nullcontext() if scratch_dir else self._build_lock:
+                # Staging'deki kodu build sırası geldiğinde projeye taşı
+                if staging_dir:
+                    shutil.copyfile(work_file_path, test_file_path)
+
+                # Build işlemini dene; yapısal hatalı kod derleyiciye gönderilmez
+                build_result = self._precheck_build(work_file_path, log_callback)
+                if build_result is None and scratch_dir:
+                    build_result = self._build_scratch_project(scratch_dir, tests_proj_dir, solution_dir, f"build-{test_file_path.stem}")
+                elif build_result is None:
+                    build_result = self.build_executor.run(
+                        self._build_command(solution_path, tests_proj_dir),
+                        cwd=solution_dir,
+                        log_path=self._log_path(tests_proj_dir, f"build-{test_file_path.stem}"),
+                        max_errors=self.build_error_limit
+                    )
+
+                if build_result.returncode == 0:
+                    self._dependencies_built = True
+
+                    # Testleri çalıştır (filtreli modda yalnızca bu dosyanın test sınıfı;
+                    # kopya projede zaten yalnızca bu dosyanın testleri vardır)
+                    test_filter = self._test_class_filter(project_name, cs_file) if self.filter_tests and not scratch_dir else None
+                    trx_path.unlink(missing_ok=True)
+                    test_result = run_streaming(
+                        self._test_command(build_dir, test_filter, trx_name=trx_path.name),
+                        cwd=solution_dir,
+                        log_path=self._log_path(tests_proj_dir, f"test-{test_file_path.stem}")
+                    )
+
+                    # Sınıf farklı bir namespace'e üretildiyse filtre eşleşmez, tüm projeyi çalıştır
+                    if test_filter and "No test matches the given testcase filter" in test_result.stdout:
+                        test_result = run_streaming(
+                            self._test_command(tests_proj_dir, trx_name=trx_path.name),
+                            cwd=solution_dir,
+                            log_path=self._log_path(tests_proj_dir, f"test-{test_file_path.stem}")
+                        )
+
+                # Diğer işçilerin build'ini bozmamak için başarısız kodu projeden çıkar;
+                # son denemede derlenen kod seri moddaki gibi projede bırakılır.
+                # Kopya projeden ana projeye yalnızca testleri geçen kod taşınır; ana projedeki
+                # mevcut (belki yeşil) test dosyası başarısız bir denemeyle ezilmez.
+                if scratch_dir:
+                    if test_result is not None and test_result.returncode == 0:
+                        shutil.copyfile(work_file_path, test_file_path)
+                elif staging_dir:
+                    keep = test_result is not None and (test_result.returncode == 0 or attempt >= max_attempts)
+                    if not keep:
+                        test_file_path.unlink(missing_ok=True)
 
             if build_result.returncode == 0:
                 log_callback("\nBuild başarılı!", "success")
-                
-                # Testleri çalıştır
                 log_callback("\nTestler çalıştırılıyor...", "info")
-                test_result = subprocess.run(
-                    [
-                        "dotnet", "test", str(tests_proj_dir),
-                        "--no-build",
-                        "--logger:trx",
-                        "--logger:console;verbosity=detailed",
-                        "--collect:\"XPlat Code Coverage\""
-                    ],
-                    capture_output=True,
-                    text=True,
-                    cwd=solution_dir
-                )
                 
                 # Test çıktısını logla
                 if test_result.stdout:
@@ -1024,7 +4387,7 @@ REQUIREMENTS:
                     log_callback(test_result.stderr, "error")
                 
                 # Test sonuçlarını analiz et
-                test_results = self.analyze_test_results(test_result, test_file_path, log_callback)
+                test_results = self.analyze_test_results(test_result, test_file_path, log_callback, trx_path=trx_path)
                 
                 if test_result.returncode == 0:
                     log_callback("\nTestler başarıyla tamamlandı!", "success")
@@ -1033,20 +4396,28 @@ REQUIREMENTS:
                     log_callback("\nBazı testler başarısız oldu.", "warning")
                     if attempt < max_attempts:
                         log_callback(f"\nTest hataları düzeltiliyor (Deneme {attempt}/{max_attempts})...", "info")
-                        previous_errors.extend([test_result.stderr] if test_result.stderr else [])
+                        failure_details = test_results.get(str(test_file_path), {}).get("error")
+                        previous_errors.extend([failure_details] if failure_details else [])
                         attempt += 1
                         continue
                     else:
+                        if scratch_dir:
+                            self._save_scratch_draft(work_file_path, tests_proj_dir, "Testleri geçmeyen", log_callback)
                         return test_results
             else:
                 log_callback(f"\nBuild hatası (Deneme {attempt}/{max_attempts}):", "error")
+                if build_result.aborted:
+                    log_callback(f"Build {len(build_result.error_lines)} hatadan sonra erken durduruldu.", "warning")
+                if build_result.log_path:
+                    log_callback(f"Build tam çıktısı: {build_result.log_path}", "info")
                 
                 # Build hatalarını ayıkla ve analiz et
                 error_messages = []
                 error_locations = {}
                 
-                if build_result.stderr:
-                    for line in build_result.stderr.split('\n'):
+                # Hata satırları build sırasında stdout/stderr akışından ayıklandı
+                if build_result.error_lines:
+                    for line in build_result.error_lines:
                         if "error" in line.lower():
                             # Hata mesajını ve konumunu ayıkla
                             error_match = re.search(r'(.*?)\((\d+),(\d+)\):\s*error\s+(\w+):\s*(.+)', line)
@@ -1068,7 +4439,7 @@ REQUIREMENTS:
                             log_callback(line.strip(), "error")
 
                 # Test dosyasının mevcut içeriğini oku
-                with open(test_file_path, 'r', encoding='utf-8') as f:
+                with open(work_file_path, 'r', encoding='utf-8') as f:
                     current_test_code = f.read()
 
                 # Hata analizi için LLM prompt'unu hazırla
@@ -1079,9 +4450,14 @@ REQUIREMENTS:
                     else:
                         error_analysis.append(str(error.get('message', '')))
 
-                # Kaynak dosyayı oku
+                # Kaynak dosyayı oku ve hatalarda adı geçen üyeleri çıkar
                 with open(cs_file, 'r', encoding='utf-8') as f:
                     source_code = f.read()
+                source_context = self.build_source_context(
+                    source_code,
+                    self.analyze_source_code(source_code),
+                    self._error_symbol_names(error_analysis)
+                )
 
                 # LLM'e gönderilecek prompt'u hazırla
                 prompt = f"""IMPORTANT: Fix the following build errors in the C# test file.
@@ -1093,7 +4469,7 @@ Build Errors:
 {chr(10).join(error_analysis)}
 
 Source code being tested:
-{source_code}
+{source_context}
 
 REQUIREMENTS:
 1. Analyze each build error and provide specific fixes
@@ -1104,15 +4480,18 @@ REQUIREMENTS:
 6. Optimize the code while fixing errors
 7. Follow C# best practices and patterns
 8. Maintain test coverage and assertions
-9. Keep the code clean and maintainable
+9. Keep the code clean and maintainable"""
 
-Return the complete corrected test code."""
-
-                # LLM'den düzeltilmiş kodu al
+                # LLM'den düzeltilmiş kodu (veya yamayı) al
                 log_callback("\nBuild hataları analiz ediliyor ve düzeltiliyor...", "info")
-                response = ""
-                for message in self.run_llm(prompt):
-                    response += str(message)
+                response = self.request_fixed_test_code(
+                    prompt,
+                    current_test_code,
+                    "build_fix",
+                    attempt,
+                    log_callback,
+                    rewrite_instruction="Return the complete corrected test code."
+                )
 
                 # Markdown kod bloklarını ve gereksiz karakterleri temizle
                 test_code = response.strip()
@@ -1125,10 +4504,10 @@ Return the complete corrected test code."""
                 test_code = '\n'.join(line.rstrip() for line in test_code.splitlines() if line.strip())
 
                 # Düzeltilmiş kodu kaydet
-                with open(test_file_path, 'w', encoding='utf-8') as f:
+                with open(work_file_path, 'w', encoding='utf-8') as f:
                     f.write(test_code)
 
-                log_callback(f"Test kodu düzeltildi ve kaydedildi: {test_file_path}", "success")
+                log_callback(f"Test kodu düzeltildi ve kaydedildi: {work_file_path}", "success")
 
                 # Hataları previous_errors listesine ekle
                 previous_errors.extend([str(error.get('message', '')) for error in error_messages])
@@ -1137,10 +4516,27 @@ Return the complete corrected test code."""
                 continue
 
         log_callback(f"\nMaksimum deneme sayısına ulaşıldı ({max_attempts}). İşlem durduruldu.", "error")
+        if scratch_dir:
+            self._save_scratch_draft(work_file_path, tests_proj_dir, "Derlenemeyen", log_callback)
+        elif staging_dir and not test_file_path.exists():
+            log_callback(f"Derlenemeyen test projeye eklenmedi, taslak: {work_file_path}", "warning")
         return test_results
 
-    def analyze_test_results(self, test_result, test_file_path, log_callback) -> dict:
+    def _save_scratch_draft(self, work_file_path: Path, tests_proj_dir: Path, reason: str, log_callback):
+        """Ana projeye taşınmayan kopya proje testini Tests.pending altına taslak olarak kaydeder."""
+        # Kopya proje sonraki dosya için temizleneceğinden taslak proje dışında saklanır
+        draft_path = tests_proj_dir.parent / "Tests.pending" / work_file_path.name
+        draft_path.parent.mkdir(exist_ok=True)
+        shutil.copyfile(work_file_path, draft_path)
+        log_callback(f"{reason} test projeye eklenmedi, taslak: {draft_path}", "warning")
+
+    def analyze_test_results(self, test_result, test_file_path, log_callback, trx_path: Path = None) -> dict:
         """Test sonuçlarını analiz eder ve raporlar."""
+        # TRX varsa sonuçları yapılandırılmış olarak oku, konsol çıktısını tarama
+        test_cases = self.read_trx_results(trx_path)
+        if test_cases:
+            return self._analyze_trx_results(test_result, test_cases, test_file_path, log_callback)
+
         # Test çıktısından hata mesajlarını ayıkla
         error_messages = []
         if test_result.stderr:
@@ -1193,9 +4589,244 @@ Return the complete corrected test code."""
             }
         }
 
+    def _analyze_trx_results(self, test_result, test_cases: List[TestCaseResult], test_file_path, log_callback) -> dict:
+        """TRX'ten okunan test sonuçlarını loglar ve sonuç sözlüğünü oluşturur."""
+        summary = summarize_test_cases(test_cases)
+        test_messages = []
+        failure_details = []
+
+        log_callback("\nTest Sonuç Mesajları:", "info")
+        for case in test_cases:
+            message = f"{case.name}: {case.outcome} ({case.duration:.3f} sn)"
+            test_messages.append(message)
+            if case.outcome == "Passed":
+                log_callback(message, "success")
+            elif case.outcome in ("Failed", "Error", "Timeout", "Aborted"):
+                log_callback(message, "error")
+                if case.message:
+                    test_messages.append(f"Hata Detayı: {case.message}")
+                    log_callback(f"Hata Detayı: {case.message}", "error")
+                failure_details.append(f"{case.name}\nMessage: {case.message}\n{case.stack_trace}".strip())
+            else:
+                log_callback(message, "warning")
+
+        log_callback(
+            f"Toplam: {summary['total']}, Başarılı: {summary['passed']}, "
+            f"Başarısız: {summary['failed']}, Atlanmış: {summary['skipped']}",
+            "info"
+        )
+
+        error = None
+        if test_result.returncode != 0:
+            error = "\n\n".join(failure_details) or test_result.stderr or None
+
+        return {
+            str(test_file_path): {
+                "output": test_result.stdout,
+                "error": error,
+                "messages": test_messages,
+                "error_messages": [],
+                "summary": summary,
+                "tests": [asdict(case) for case in test_cases]
+            }
+        }
+
+def cli_log(message: str, level: str = "info"):
+    """Log kayıtlarını renkli olarak konsola yazar."""
+    colors = {
+        "info": "",
+        "success": Fore.GREEN,
+        "error": Fore.RED,
+        "warning": Fore.YELLOW
+    }
+    print(f"{colors.get(level, '')}{message}{Style.RESET_ALL}", flush=True)
+
+@app.command()
+def run(
+    solution_path: Path = typer.Argument(..., help="Solution (.sln) dosyası veya test edilecek kaynak dizini"),
+    concurrency: int = typer.Option(1, "--concurrency", "-j", help="Paralel işçi sayısı"),
+    model: str = typer.Option("mistral-large-latest", "--model", help="Mistral model adı"),
+    max_attempts: int = typer.Option(5, "--max-attempts", help="Dosya başına en fazla deneme"),
+    api_key: str = typer.Option(None, "--api-key", envvar="MISTRAL_API_KEY", help="Mistral API anahtarı"),
+    report: Path = typer.Option(Path("test-generator-report.json"), "--report", help="JSON rapor dosyası"),
+    shard_index: int = typer.Option(0, "--shard-index", help="Bu makinenin parça numarası (0'dan başlar)"),
+    shard_count: int = typer.Option(1, "--shard-count", help="Toplam parça sayısı"),
+    coverage: bool = typer.Option(False, "--coverage", help="Sonda kod kapsamını ölç"),
+    build_error_limit: int = typer.Option(None, "--build-error-limit", help="Bu kadar build hatası görülünce build'i erken durdur (0: sınırsız)"),
+    refresh_cache: bool = typer.Option(False, "--refresh-cache", help="LLM önbelleğini okuma, yalnızca güncelle"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="LLM önbelleğini kapat"),
+    force: bool = typer.Option(False, "--force", help="Değişmemiş dosyaları da yeniden üret"),
+    provider: str = typer.Option("mistral", "--provider", help="LLM sağlayıcısı: mistral veya ollama"),
+    ollama_url: str = typer.Option("http://localhost:11434", "--ollama-url", help="Ollama sunucu adresi"),
+    llm_concurrency: int = typer.Option(4, "--llm-concurrency", help="Aynı anda en fazla LLM isteği"),
+    rpm: int = typer.Option(None, "--rpm", help="Sağlayıcının dakikalık istek sınırı"),
+    tpm: int = typer.Option(None, "--tpm", help="Sağlayıcının dakikalık token sınırı"),
+    llm_retries: int = typer.Option(5, "--llm-retries", help="Hız sınırı/sunucu hatalarında en fazla tekrar"),
+    no_stream: bool = typer.Option(False, "--no-stream", help="LLM yanıtlarını akış yerine tek parça al"),
+    no_patch: bool = typer.Option(False, "--no-patch", help="Düzeltmelerde diff yerine tüm test kodunu iste"),
+    candidates: int = typer.Option(1, "--candidates", help="İlk denemede paralel üretilecek test adayı sayısı"),
+    context_budget: int = typer.Option(3000, "--context-budget", help="Prompt'a eklenecek kaynak bağlamı için token bütçesi (0: tüm kaynak)"),
+    shared_build: bool = typer.Option(False, "--shared-build", help="Paralel modda kopya projeler yerine ortak test projesinde sırayla derle"),
+    no_build_server: bool = typer.Option(False, "--no-build-server", help="MSBuild düğümlerini ve derleyici sunucusunu build'ler arasında sıcak tutma"),
+    always_restore: bool = typer.Option(False, "--always-restore", help="Proje dosyaları değişmemiş olsa da restore çalıştır"),
+    package_feed: Path = typer.Option(None, "--package-feed", help="Test paketlerinin restore edileceği yerel klasör feed'i (yoksa hazırlanır)"),
+    reference_all_projects: bool = typer.Option(False, "--reference-all-projects", help="Test projesine solution'daki tüm projeleri referansla ve solution'ı derle")
+):
+    """Testleri GUI olmadan üretir, çalıştırır ve JSON rapor yazar."""
+    colorama_init()
+    solution_file = solution_path if solution_path.suffix == ".sln" else None
+    source_path = solution_path.parent if solution_file else solution_path
+
+    generator = CSharpTestGenerator(
+        api_key,
+        model=model,
+        max_attempts=max_attempts,
+        max_workers=concurrency,
+        cache_mode="off" if no_cache else "refresh" if refresh_cache else "use",
+        skip_unchanged=not force,
+        collect_coverage=coverage,
+        build_error_limit=build_error_limit or None,
+        solution_file=solution_file,
+        shard_index=shard_index,
+        shard_count=shard_count,
+        provider=provider,
+        ollama_url=ollama_url,
+        llm_concurrency=llm_concurrency,
+        requests_per_minute=rpm,
+        tokens_per_minute=tpm,
+        llm_max_retries=llm_retries,
+        context_token_budget=context_budget or None,
+        stream_responses=not no_stream,
+        patch_mode=not no_patch,
+        candidates=candidates,
+        isolated_builds=not shared_build,
+        keep_build_servers=not no_build_server,
+        skip_unchanged_restore=not always_restore,
+        package_feed=package_feed,
+        prune_references=not reference_all_projects
+    )
+
+    started = time.time()
+    try:
+        generator.generate_and_run_tests(str(source_path), cli_log)
+    finally:
+        generator.close()
+
+    run_report = generator.build_report()
+    run_report["solution"] = str(solution_path)
+    run_report["started"] = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(started))
+    run_report["duration"] = round(time.time() - started, 3)
+    report.parent.mkdir(parents=True, exist_ok=True)
+    with open(report, 'w', encoding='utf-8') as f:
+        json.dump(run_report, f, indent=2, ensure_ascii=False)
+
+    totals = run_report["totals"]
+    cli_log(
+        f"\nRapor yazıldı: {report} (başarılı: {totals['passed']}, başarısız: {totals['failed']}, "
+        f"atlanan: {totals['skipped']}, hata: {totals['errors']})",
+        "success" if not totals["failed"] and not totals["errors"] else "warning"
+    )
+    if totals["failed"] or totals["errors"]:
+        raise typer.Exit(code=1)
+
+def synthetic_csharp_source(method_count: int) -> str:
+    """Parser karşılaştırması için çok sayıda üye içeren büyük bir C# sınıfı üretir."""
+    members = []
+    for index in range(method_count):
+        members.append(f"""
+        /// <summary>Method {index}</summary>
+        public async Task<Dictionary<string, List<int>>> Method{index}Async(int id, string name = "a{{b}}", CancellationToken ct = default)
+        {{
+            var text = $"{{id}}:{{name}} }} {{{{";
+            if (id > {index}) {{ foreach (var item in _items) {{ _logger.Log(item); }} }}
+            return await _repository.GetAsync(id, ct);
+        }}
+        public int Property{index} => _items.Count + {index};
+        public int Compute{index}(int value) => value * {index};
+        public T Convert{index}<T>(object value) where T : class {{ return value as T; }}""")
+    return f"""using System;
+using System.Collections.Generic;
+using System.Threading.Tasks;
+
+namespace Benchmark.Generated
+{{
+    public partial class LargeService
+    {{
+        private readonly IRepository _repository;
+        private readonly ILogger<LargeService> _logger;
+        private readonly List<string> _items = new();
+
+        public LargeService(IRepository repository, ILogger<LargeService> logger)
+        {{
+            _repository = repository;
+            _logger = logger;
+        }}
+{"".join(members)}
+    }}
+}}
+"""
+
+@app.command("benchmark-parser")
+def benchmark_parser(
+    source_path: Path = typer.Argument(None, help="Taranacak .cs dosyası veya dizini (verilmezse yalnızca sentetik dosya)"),
+    synthetic_methods: int = typer.Option(2000, "--synthetic-methods", help="Sentetik büyük dosyadaki üye grubu sayısı; her grupta 3 metod ve 1 property (0: kapalı)"),
+    repeat: int = typer.Option(3, "--repeat", help="Her ölçümün tekrar sayısı (en iyi süre alınır)")
+):
+    """analyze_source_code'un tokenizer tabanlı ve eski regex sürümlerini karşılaştırır."""
+    sources = []
+    if source_path:
+        files = [source_path] if source_path.is_file() else sorted(source_path.rglob("*.cs"))
+        for cs_file in files:
+            try:
+                sources.append((str(cs_file), cs_file.read_text(encoding='utf-8')))
+            except (OSError, UnicodeDecodeError):
+                continue
+    if synthetic_methods > 0:
+        sources.append((f"<sentetik: {synthetic_methods} metod>", synthetic_csharp_source(synthetic_methods)))
+    if not sources:
+        cli_log("Karşılaştırılacak kaynak bulunamadı.", "error")
+        raise typer.Exit(code=1)
+
+    def best_time(function, source_code: str) -> float:
+        timings = []
+        for _ in range(max(1, repeat)):
+            started = time.perf_counter()
+            function(source_code)
+            timings.append(time.perf_counter() - started)
+        return min(timings)
+
+    totals = {"parser": 0.0, "regex": 0.0}
+    # Tek tek yalnızca en büyük dosyalar yazdırılır
+    largest = sorted(sources, key=lambda item: len(item[1]), reverse=True)[:10]
+    for name, source_code in sources:
+        parser_time = best_time(CSharpTestGenerator.analyze_source_code, source_code)
+        regex_time = best_time(CSharpTestGenerator._analyze_source_code_regex, source_code)
+        totals["parser"] += parser_time
+        totals["regex"] += regex_time
+        if (name, source_code) in largest:
+            parser_methods = len(CSharpTestGenerator.analyze_source_code(source_code)["methods"])
+            regex_methods = len(CSharpTestGenerator._analyze_source_code_regex(source_code)["methods"])
+            cli_log(
+                f"{name} ({len(source_code) // 1024} KB): parser {parser_time * 1000:.1f} ms / {parser_methods} metod, "
+                f"regex {regex_time * 1000:.1f} ms / {regex_methods} metod",
+                "info"
+            )
+    cli_log(
+        f"Toplam {len(sources)} dosya: parser {totals['parser'] * 1000:.1f} ms, regex {totals['regex'] * 1000:.1f} ms",
+        "success"
+    )
+
+@app.command()
+def gui():
+    """Tk arayüzünü başlatır."""
+    TestGeneratorGUI().root.mainloop()
+
 def main():
-    app = TestGeneratorGUI()
-    app.root.mainloop()
+    # Argüman verilmezse eskisi gibi GUI açılır
+    if len(sys.argv) > 1:
+        app()
+    else:
+        gui()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file